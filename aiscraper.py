@@ -1,8 +1,6 @@
 import time
 import streamlit as st
 from duckduckgo_search import DDGS
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains import LLMChain
 from datetime import datetime
 from langchain.prompts import PromptTemplate
 from langchain_core.tools import Tool
@@ -10,9 +8,13 @@ from langchain_community.tools import  DuckDuckGoSearchRun
 from langchain.agents import initialize_agent, Tool, AgentType
 from dotenv import load_dotenv
 import os
-
-GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash",google_api_key=GOOGLE_API_KEY)
+import retrieval
+import metrics
+import profiler
+from singleflight import coalesce
+from object_cache import shared_cache
+from compression import compress_context
+import llm_scheduler
 
 # Initialize session state for bookmarks if not exists
 if 'bookmarks' not in st.session_state:
@@ -31,31 +33,34 @@ def save_bookmark(item, item_type="techtalker"):
     }
     st.session_state.bookmarks.append(bookmark)
 
+# Runs as a button callback, before the tab's fragment reruns
+def bookmark_response(state_key, item_type, message):
+    save_bookmark(st.session_state[state_key], item_type)
+    st.toast(message)
+    # Clear the current response after bookmarking
+    st.session_state[state_key] = None
+
 # st.set_page_config(page_title="AI News Processor", page_icon="🖥️")
 # tab1, tab2,tab3 = st.tabs(["🧑‍💻 TechTalker", "⌛ Timeline","📃Events"])
 
 def search(topic):
-    with DDGS() as ddg:
-        results = ddg.text(f"{topic} news {datetime.now().strftime('%Y-%m')}", max_results=3)
-        if results:
-            return "\n\n".join([
-                f"Title: {result['title']}\nURL: {result['href']}\nSummary: {result['body']}"
-                for result in results
-            ])
-        return f"No news found for {topic}."
+    # DDGS, TechCrunch, Hacker News and arXiv are queried in parallel;
+    # sources that miss their deadline are left out of the context.
+    hits = retrieval.gather(topic)
+    if hits:
+        return retrieval.format_hits(hits)
+    return f"No news found for {topic}."
 
 # Add caching for better performance
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@coalesce("search_results")
+@shared_cache("search_results", ttl=3600, namespace="search")  # Cache for 1 hour
+@metrics.timed("fetch.retrieval")
 def cached_search(topic):
     return search(topic)
 
-# === TechTalker Tab ===
-def techtalker_tab():
-    st.title("🧑‍💻 TechTalker")
-
-    tech_prompt = PromptTemplate(
-        input_variables=["raw_news", "topic", "engagement", "length"],
-        template="""
+tech_prompt = PromptTemplate(
+    input_variables=["raw_news", "topic", "engagement", "length"],
+    template="""
 You are a knowledgeable, engaging tech news, blog, article, conference expert creating a detailed explainer about "{topic}" based on the raw news below.
 
 Instructions:
@@ -77,18 +82,64 @@ provide link for further reading if available
 Raw news input:
 {raw_news}
 """
-    )
+)
+
+timeline_prompt = PromptTemplate(
+    input_variables=["text", "topic", "engagement", "length"],
+    template="""
+You are a tech historian and futurist assistant.
+
+Using  news content,blogs, articles, and any valuabe source , generate a clear, engaging timeline of the topic "{topic}" including:
+
+- 📜 Key historical events or milestones
+- ⚡ Recent updates or changes
+- 🔮 Reasonable predictions about where it's going
+- 🏆 For each key topic mentioned, include their major tech achievements or products during those years 
+Format the timeline in markdown with:
+- Date (approximate is okay)
+- Event summary
+- Emojis if helpful
+- Keep it fun, factual, and informative
+- Use a tone that is {engagement}/10 on a fun, playful scale — more means livelier and more emojis.
+- The report should be about {length} words long — more words for deeper details.
+- Separate sections or bullet points for topic achievements
+- add product history for each topic mentioned in the news
+provide link for further reading if available
 
-    tech_chain = LLMChain(llm=llm, prompt=tech_prompt)
 
-    def process_tech_news(topic, engagement, length):
-        news = cached_search(topic)
-        return tech_chain.run(raw_news=news, topic=topic, engagement=engagement, length=length)
+News content:
+{text}
+"""
+)
+
+def generate_explainer(topic, engagement, length):
+    """Build the TechTalker explainer for a topic."""
+    news = compress_context(cached_search(topic), topic, length)
+    prompt = tech_prompt.format(raw_news=news, topic=topic, engagement=engagement, length=length)
+    with metrics.timed("llm.techtalker"):
+        return llm_scheduler.invoke(prompt, llm_scheduler.INTERACTIVE).content
+
+def generate_timeline(topic, engagement, length):
+    """Build the Tech Timeline for a topic."""
+    news = compress_context(cached_search(topic), topic, length)
+    prompt = timeline_prompt.format(text=news, topic=topic, engagement=engagement, length=length)
+    with metrics.timed("llm.timeline"):
+        return llm_scheduler.invoke(prompt, llm_scheduler.INTERACTIVE).content
 
-    topic_input = st.text_input("Enter  topic:", placeholder="e.g artificial intelligence")
+# === TechTalker Tab ===
+@st.fragment
+@profiler.profiled("techtalker_tab")
+@metrics.timed("render.techtalker")
+def techtalker_tab():
+    st.title("🧑‍💻 TechTalker")
+
+    topic_input = st.text_input("Enter  topic:", placeholder="e.g artificial intelligence", key="techtalker_topic_input")
     expand = st.expander("⚙️ Settings", expanded=False)
-    engagement_level = expand.slider("Tone Playfulness (Fun Level)", 0, 10, 5, key="engagement_slider")
-    length_words = expand.slider("Report Length (Words)", 200, 800, 500, step=50, key="length_slider")
+    # Defaults are seeded in session state since main.py re-assigns these keys
+    st.session_state.setdefault("engagement_slider", 5)
+    st.session_state.setdefault("length_slider", 500)
+    engagement_level = expand.slider("Tone Playfulness (Fun Level)", 0, 10, key="engagement_slider")
+    length_words = expand.slider("Report Length (Words)", 200, 800, step=50, key="length_slider")
 
     # Initialize session state for the current response
     if 'current_techtalker_response' not in st.session_state:
@@ -97,7 +148,11 @@ Raw news input:
     if st.button("🧠 Generate Explainer", type="primary"):
         if topic_input.strip():
             with st.spinner("Processing..."):
-                output = process_tech_news(topic_input, engagement_level, length_words)
+                try:
+                    output = generate_explainer(topic_input, engagement_level, length_words)
+                except llm_scheduler.LLMOverloaded as e:
+                    st.error(f"The AI service is busy right now, please try again shortly. ({e})")
+                    return
                 st.session_state.current_techtalker_response = {
                     "title": f"Tech Talker: {topic_input}",
                     "content": output,
@@ -113,54 +168,23 @@ Raw news input:
     if st.session_state.current_techtalker_response and st.session_state.current_techtalker_response.get("content"):
         col1, col2 = st.columns([0.9, 0.1])
         with col1:
-            if st.button("🔖 Bookmark This Response", key="bookmark_techtalker"):
-                save_bookmark(st.session_state.current_techtalker_response, "techtalker")
-                st.success("Response bookmarked!")
-                # Clear the current response after bookmarking
-                st.session_state.current_techtalker_response = None
-                st.rerun()
-
+            st.button(
+                "🔖 Bookmark This Response", key="bookmark_techtalker",
+                on_click=bookmark_response, args=("current_techtalker_response", "techtalker", "Response bookmarked!")
+            )
+
+@st.fragment
+@profiler.profiled("techtimeline_tab")
+@metrics.timed("render.timeline")
 def techtimeline_tab():
     st.title("⌛Discover Timeline")
 
-    timeline_prompt = PromptTemplate(
-        input_variables=["text", "topic", "engagement", "length"],
-        template="""
-You are a tech historian and futurist assistant.
-
-Using  news content,blogs, articles, and any valuabe source , generate a clear, engaging timeline of the topic "{topic}" including:
-
-- 📜 Key historical events or milestones
-- ⚡ Recent updates or changes
-- 🔮 Reasonable predictions about where it's going
-- 🏆 For each key topic mentioned, include their major tech achievements or products during those years 
-Format the timeline in markdown with:
-- Date (approximate is okay)
-- Event summary
-- Emojis if helpful
-- Keep it fun, factual, and informative
-- Use a tone that is {engagement}/10 on a fun, playful scale — more means livelier and more emojis.
-- The report should be about {length} words long — more words for deeper details.
-- Separate sections or bullet points for topic achievements
-- add product history for each topic mentioned in the news
-provide link for further reading if available
-
-
-News content:
-{text}
-"""
-    )
-
-    timeline_chain = LLMChain(llm=llm, prompt=timeline_prompt)
-
-    def process_event_news(topic, engagement, length):
-        news = cached_search(topic)
-        return timeline_chain.run(text=news, topic=topic,engagement=engagement, length=length)
-
     timeline_input = st.text_input("Enter timeline topic:", placeholder="e.g artificial intelligence", key="timeline_topic_input")
     expand2 = st.expander("⚙️ Settings", expanded=False)
-    timeline_engagement=expand2.slider("Tone Playfulness (Fun Level)", 0, 10, 5, key="timeline_engagement")
-    timeline_length=expand2.slider("Timeline Depth (Not Used)", 200, 800, 500, step=50, key="timeline_length")
+    st.session_state.setdefault("timeline_engagement", 5)
+    st.session_state.setdefault("timeline_length", 500)
+    timeline_engagement=expand2.slider("Tone Playfulness (Fun Level)", 0, 10, key="timeline_engagement")
+    timeline_length=expand2.slider("Timeline Depth (Not Used)", 200, 800, step=50, key="timeline_length")
 
     # Initialize session state for the current response
     if 'current_timeline_response' not in st.session_state:
@@ -169,7 +193,11 @@ News content:
     if st.button("📅 Generate Timeline", type="secondary"):
         if timeline_input.strip():
             with st.spinner("Generating timeline..."):
-                timeline_output = process_event_news(timeline_input, timeline_engagement, timeline_length)
+                try:
+                    timeline_output = generate_timeline(timeline_input, timeline_engagement, timeline_length)
+                except llm_scheduler.LLMOverloaded as e:
+                    st.error(f"The AI service is busy right now, please try again shortly. ({e})")
+                    return
                 st.session_state.current_timeline_response = {
                     "title": f"Tech Timeline: {timeline_input}",
                     "content": timeline_output,
@@ -186,9 +214,7 @@ News content:
     if st.session_state.current_timeline_response and st.session_state.current_timeline_response.get("content"):
         col1, col2 = st.columns([0.9, 0.1])
         with col1:
-            if st.button("🔖 Bookmark This Timeline", key="bookmark_timeline"):
-                save_bookmark(st.session_state.current_timeline_response, "timeline")
-                st.success("Timeline bookmarked!")
-                # Clear the current response after bookmarking
-                st.session_state.current_timeline_response = None
-                st.rerun()
+            st.button(
+                "🔖 Bookmark This Timeline", key="bookmark_timeline",
+                on_click=bookmark_response, args=("current_timeline_response", "timeline", "Timeline bookmarked!")
+            )
@@ -8,52 +8,73 @@ from bs4 import BeautifulSoup
 from summarizer import summarize_text
 from components.bookmarks import save_bookmark
 import re
+import metrics
+import profiler
+from singleflight import coalesce
+import object_cache
+from object_cache import shared_cache
+import arxiv_cache
+import related
+from utils import render_related
+
+ARXIV_API_URL = 'http://export.arxiv.org/api/query'
+
+# Map common terms to arXiv categories
+CATEGORY_MAP = {
+    "ai": "cs.AI", "artificial intelligence": "cs.AI",
+    "machine learning": "cs.LG", "ml": "cs.LG",
+    "computer vision": "cs.CV", "cv": "cs.CV",
+    "nlp": "cs.CL", "natural language": "cs.CL",
+    "robotics": "cs.RO", "robots": "cs.RO",
+    "data science": "cs.LG", "deep learning": "cs.LG",
+    "neural networks": "cs.LG", "reinforcement learning": "cs.LG"
+}
+
+def build_search_query(query, search_type="all"):
+    """arXiv search_query for a user query. Case and spacing are normalized
+    (arXiv search ignores both), so equivalent queries share cached results."""
+    query = " ".join(query.split())
+    if search_type == "category":
+        # Category ids are case-sensitive (cs.AI), so only mapped terms are normalized
+        return f'cat:{CATEGORY_MAP.get(query.lower(), query)}'
+    query = query.lower()
+    if search_type == "title":
+        return f'ti:"{query}"'
+    elif search_type == "abstract":
+        return f'abs:"{query}"'
+    elif search_type == "author":
+        return f'au:"{query}"'
+    # "all" - search in title, abstract, and keywords
+    # Use OR to search in multiple fields for better relevance
+    return f'ti:"{query}" OR abs:"{query}" OR all:"{query}"'
 
 # Cache the arXiv search results
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def search_arxiv(query, max_results=10, search_type="all"):
-    """Search arXiv with improved query construction and retry logic."""
-    max_retries = 3
+@coalesce("arxiv_search")
+@shared_cache("arxiv_search", ttl=3600, namespace="feeds.arxiv")  # Cache for 1 hour
+def search_arxiv(query, max_results=10, search_type="all", _timeout=None):
+    """Search arXiv. Results persist in arxiv_cache; smaller or repeated
+    searches are answered from it and larger ones only fetch the missing
+    range. With _timeout the API gets one attempt with that timeout
+    instead of three slow retries."""
+    search_query = build_search_query(query, search_type)
+    if _timeout:
+        fetch = lambda start, count: fetch_search_results(search_query, start, count, timeout=_timeout, max_retries=1)
+    else:
+        fetch = lambda start, count: fetch_search_results(search_query, start, count)
+    return arxiv_cache.search(search_query, max_results, fetch)
+
+def fetch_search_results(search_query, start, count, timeout=30, max_retries=3):
+    """Fetch one range of search results from the API with retry logic."""
     retry_delay = 2  # seconds
     
     for attempt in range(max_retries):
         try:
-            # Clean and format the query
-            query = query.strip()
-            
-            # Construct different search queries based on search type
-            if search_type == "title":
-                search_query = f'ti:"{query}"'
-            elif search_type == "abstract":
-                search_query = f'abs:"{query}"'
-            elif search_type == "author":
-                search_query = f'au:"{query}"'
-            elif search_type == "category":
-                # Map common terms to arXiv categories
-                category_map = {
-                    "ai": "cs.AI", "artificial intelligence": "cs.AI",
-                    "machine learning": "cs.LG", "ml": "cs.LG",
-                    "computer vision": "cs.CV", "cv": "cs.CV",
-                    "nlp": "cs.CL", "natural language": "cs.CL",
-                    "robotics": "cs.RO", "robots": "cs.RO",
-                    "data science": "cs.LG", "deep learning": "cs.LG",
-                    "neural networks": "cs.LG", "reinforcement learning": "cs.LG"
-                }
-                query_lower = query.lower()
-                if query_lower in category_map:
-                    search_query = f'cat:{category_map[query_lower]}'
-                else:
-                    search_query = f'cat:{query}'
-            else:  # "all" - search in title, abstract, and keywords
-                # Use OR to search in multiple fields for better relevance
-                search_query = f'ti:"{query}" OR abs:"{query}" OR all:"{query}"'
-            
             # Construct the API URL
-            base_url = 'http://export.arxiv.org/api/query'
+            base_url = ARXIV_API_URL
             params = {
                 'search_query': search_query,
-                'start': 0,
-                'max_results': max_results,
+                'start': start,
+                'max_results': count,
                 'sortBy': 'relevance',  # Changed from submittedDate to relevance
                 'sortOrder': 'descending'
             }
@@ -64,8 +85,9 @@ def search_arxiv(query, max_results=10, search_type="all"):
             }
             
             # Make the request
-            response = requests.get(base_url, params=params, headers=headers, timeout=30)
-            response.raise_for_status()
+            with metrics.timed("fetch.arxiv_search"):
+                response = requests.get(base_url, params=params, headers=headers, timeout=timeout)
+                response.raise_for_status()
             
             return response.text
             
@@ -100,7 +122,9 @@ def calculate_relevance_score(paper, query):
     return score
 
 # Cache the arXiv papers fetching
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@coalesce("arxiv_recent")
+@shared_cache("arxiv_recent", ttl=3600, namespace="feeds.arxiv")  # Cache for 1 hour
+@metrics.timed("fetch.arxiv_recent")
 def fetch_arxiv_papers(max_results=10, days_back=7):
     """Fetch recent papers from arXiv with retry logic."""
     max_retries = 3
@@ -151,6 +175,46 @@ def fetch_arxiv_papers(max_results=10, days_back=7):
                 st.error(f"Failed to fetch papers after {max_retries} attempts: {str(e)}")
                 return []
 
+@metrics.timed("parse.arxiv")
+def parse_arxiv_response(xml_response):
+    """Parse an arXiv Atom response into a list of paper dicts."""
+    if xml_response is None:
+        return []
+    
+    try:
+        # Parse the XML
+        root = ET.fromstring(xml_response)
+        
+        # Define namespace
+        namespace = {'atom': 'http://www.w3.org/2005/Atom'}
+        
+        # Extract entries
+        entries = root.findall('atom:entry', namespace)
+        
+        results = []
+        for entry in entries:
+            # Skip if this is the OpenSearch entry
+            if entry.find('atom:id', namespace).text.startswith('http://arxiv.org/api/'):
+                continue
+                
+            # Extract paper details
+            paper = {
+                'title': entry.find('atom:title', namespace).text.strip(),
+                'authors': [author.find('atom:name', namespace).text for author in entry.findall('atom:author', namespace)],
+                'summary': entry.find('atom:summary', namespace).text.strip(),
+                'link': entry.find('atom:id', namespace).text,
+                'pdf_link': next((link.get('href') for link in entry.findall('atom:link', namespace) 
+                                if link.get('title') == 'pdf'), None)
+            }
+            results.append(paper)
+        
+        return results
+        
+    except Exception as e:
+        metrics.record_error("parse.arxiv")
+        st.error(f"Error parsing arXiv response: {str(e)}")
+        return []
+
 def save_bookmark(paper, item_type="academic_paper"):
     """Save a paper to bookmarks with optimized performance."""
     try:
@@ -186,6 +250,15 @@ def save_bookmark(paper, item_type="academic_paper"):
         st.error(f"Error saving bookmark: {str(e)}")
         return False
 
+def _refresh_results():
+    # Only arXiv results are dropped; summaries stay cached
+    object_cache.invalidate("feeds.arxiv")
+    arxiv_cache.expire()
+    st.toast("Cache cleared! Search again for fresh results.")
+
+@st.fragment
+@profiler.profiled("render_academic_papers_tab")
+@metrics.timed("render.academic_papers")
 def render_academic_papers_tab():
     # App title and description
     st.title("📚 Academic Research Paper Search")
@@ -195,30 +268,30 @@ def render_academic_papers_tab():
     # Cache control
     col1, col2 = st.columns([3, 1])
     with col2:
-        if st.button("Refresh", help="Clear cached results to get fresh papers"):
-            st.cache_data.clear()
-            st.success("Cache cleared! Search again for fresh results.")
-            st.rerun()
+        st.button("Refresh", help="Clear cached results to get fresh papers", on_click=_refresh_results)
 
     # Search configuration
     col1, col2, col3 = st.columns([2, 1, 1])
     
     with col1:
-        search_query = st.text_input("Enter a topic or keyword:", placeholder="e.g artificial intelligence")
+        search_query = st.text_input("Enter a topic or keyword:", placeholder="e.g artificial intelligence", key="arxiv_query")
     
     with col2:
         search_type = st.selectbox(
             "Search in:",
             ["all", "title", "abstract", "author", "category"],
-            help="Choose where to search for your query"
+            help="Choose where to search for your query",
+            key="arxiv_search_type"
         )
     
     with col3:
+        # Default seeded in session state since main.py re-assigns this key
+        st.session_state.setdefault("arxiv_max_results", 10)
         max_results = st.selectbox(
             "Max results:",
             [5, 10, 15, 20],
-            index=1,
-            help="Maximum number of papers to return"
+            help="Maximum number of papers to return",
+            key="arxiv_max_results"
         )
         # Search tips
     with st.expander("💡 Search Tips", expanded=False):
@@ -240,44 +313,6 @@ def render_academic_papers_tab():
     # Search button
     search_button = st.button("🔍 Search Papers", use_container_width=True)
     
-    # Function to parse XML response from arXiv
-    def parse_arxiv_response(xml_response):
-        if xml_response is None:
-            return []
-        
-        try:
-            # Parse the XML
-            root = ET.fromstring(xml_response)
-            
-            # Define namespace
-            namespace = {'atom': 'http://www.w3.org/2005/Atom'}
-            
-            # Extract entries
-            entries = root.findall('atom:entry', namespace)
-            
-            results = []
-            for entry in entries:
-                # Skip if this is the OpenSearch entry
-                if entry.find('atom:id', namespace).text.startswith('http://arxiv.org/api/'):
-                    continue
-                    
-                # Extract paper details
-                paper = {
-                    'title': entry.find('atom:title', namespace).text.strip(),
-                    'authors': [author.find('atom:name', namespace).text for author in entry.findall('atom:author', namespace)],
-                    'summary': entry.find('atom:summary', namespace).text.strip(),
-                    'link': entry.find('atom:id', namespace).text,
-                    'pdf_link': next((link.get('href') for link in entry.findall('atom:link', namespace) 
-                                    if link.get('title') == 'pdf'), None)
-                }
-                results.append(paper)
-            
-            return results
-            
-        except Exception as e:
-            st.error(f"Error parsing arXiv response: {str(e)}")
-            return []
-
     # Search and display results when button is clicked
     if search_button and search_query:
         with st.spinner("Searching for papers..."):
@@ -303,6 +338,10 @@ def render_academic_papers_tab():
                     relevant_papers = [p for p in papers if p['relevance_score'] >= 1]
                     
                     if relevant_papers:
+                        related.add_many(
+                            {"url": p['link'], "title": p['title'], "text": p['summary'], "source": "arxiv"}
+                            for p in relevant_papers
+                        )
                         st.success(f"Found {len(relevant_papers)} relevant papers for '{search_query}'")
                         st.markdown("---")
                         
@@ -315,6 +354,7 @@ def render_academic_papers_tab():
                                 # Abstract
                                 st.markdown("**📝 Abstract:**")
                                 st.markdown(paper['summary'])
+                                render_related(paper['link'], paper['title'], paper['summary'])
                                 
                                 # Links and Bookmark
                                 col1, col2, col3 = st.columns([0.4, 0.4, 0.2])
@@ -0,0 +1,118 @@
+"""
+Compact, indexed storage for scraped articles.
+
+Articles are slotted records whose category and topic strings are interned,
+so thousands of articles share one copy of each label. The store keeps
+category -> articles and topic -> articles indexes as integer bitsets, so
+building the filter facets and filtering are lookups rather than scans.
+"""
+import itertools
+import sys
+
+UNKNOWN_CATEGORY = "Unknown"
+UNKNOWN_TOPIC = "topic not available"
+
+_generations = itertools.count()
+
+
+class Article:
+    __slots__ = ("id", "title", "url", "author", "date", "category", "content", "topics")
+
+    def __init__(self, id, title, url, author, date, category, content, topics):
+        self.id = id
+        self.title = title
+        self.url = url
+        self.author = author
+        self.date = date
+        self.category = category
+        self.content = content
+        self.topics = topics
+
+    @classmethod
+    def from_dict(cls, id, data):
+        return cls(
+            id=id,
+            title=data.get("title", ""),
+            url=data.get("url", ""),
+            author=sys.intern(data.get("author", "Unknown")),
+            date=data.get("date", ""),
+            category=sys.intern(data.get("category", UNKNOWN_CATEGORY)),
+            content=data.get("content", ""),
+            topics=tuple(sys.intern(t) for t in data.get("topics", ())),
+        )
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "url": self.url,
+            "author": self.author,
+            "date": self.date,
+            "category": self.category,
+            "content": self.content,
+            "topics": list(self.topics),
+        }
+
+
+def _bitset(ids, size):
+    """Build an int bitset from a list of ids in one pass."""
+    bits = bytearray((size + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _iter_bits(mask):
+    """Yield the positions of the set bits in an int, lowest first."""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for byte_idx, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (byte_idx << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+class ArticleStore:
+    """Immutable article collection with category and topic bitset indexes."""
+
+    def __init__(self, articles):
+        self.articles = articles
+        self._all = (1 << len(articles)) - 1
+        category_ids = {}
+        topic_ids = {}
+        for article in articles:
+            category_ids.setdefault(article.category, []).append(article.id)
+            for topic in article.topics:
+                topic_ids.setdefault(topic, []).append(article.id)
+        size = len(articles)
+        self._by_category = {c: _bitset(ids, size) for c, ids in category_ids.items()}
+        self._by_topic = {t: _bitset(ids, size) for t, ids in topic_ids.items()}
+
+        self.categories = sorted(c for c in self._by_category if c != UNKNOWN_CATEGORY)
+        self.topics = sorted(t for t in self._by_topic if t != UNKNOWN_TOPIC)
+        # Distinguishes results cached for this store from an older store's
+        self.generation = next(_generations)
+
+    @classmethod
+    def from_dicts(cls, articles):
+        return cls([Article.from_dict(i, a) for i, a in enumerate(articles)])
+
+    def __len__(self):
+        return len(self.articles)
+
+    def mask(self, category="All", topic="All"):
+        mask = self._all
+        if category != "All":
+            mask &= self._by_category.get(category, 0)
+        if topic != "All":
+            mask &= self._by_topic.get(topic, 0)
+        return mask
+
+    def count(self, category="All", topic="All"):
+        return self.mask(category, topic).bit_count()
+
+    def filter(self, category="All", topic="All"):
+        """Articles matching both filters, in original order ("All" matches everything)."""
+        mask = self.mask(category, topic)
+        if mask == self._all:
+            return list(self.articles)
+        return [self.articles[i] for i in _iter_bits(mask)]
@@ -0,0 +1,191 @@
+"""
+Persistent, superset-aware cache of arXiv search results.
+
+Results are kept per search query as a growing, ordered list of Atom
+<entry> elements rather than per request:
+- a request for 10 results is answered from 20 cached ones
+- a request for 30 when 20 are cached fetches only results 20-29
+- queries are normalized by the caller (see app2.build_search_query), so
+  "Transformer" and " transformer" share one entry
+
+Searches are stored in SQLite (ARXIV_SEARCH_CACHE_PATH), so they survive
+restarts. They stay fresh for ARXIV_SEARCH_TTL and are then fetched again.
+A stale copy is still served when arXiv can't be reached.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+import metrics
+from config import Config
+
+ATOM = "http://www.w3.org/2005/Atom"
+OPENSEARCH = "http://a9.com/-/spec/opensearch/1.1/"
+_NS = {"atom": ATOM, "opensearch": OPENSEARCH}
+
+
+class SearchCache:
+    """SQLite store of ordered result lists, LRU-capped by search count."""
+
+    def __init__(self, path, max_searches):
+        self.path = path
+        self.max_searches = max_searches
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches ("
+                " query TEXT PRIMARY KEY, entries TEXT, total INTEGER, fetched_at REAL, last_access REAL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, query):
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT entries, total, fetched_at FROM searches WHERE query = ?", (query,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE searches SET last_access = ? WHERE query = ?", (time.time(), query))
+            db.commit()
+        entries, total, fetched_at = row
+        return {"entries": json.loads(entries), "total": total, "fetched_at": fetched_at}
+
+    def store(self, query, entries, total, fetched_at):
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?)",
+                (query, json.dumps(entries), total, fetched_at, time.time()),
+            )
+            db.execute(
+                "DELETE FROM searches WHERE query NOT IN"
+                " (SELECT query FROM searches ORDER BY last_access DESC LIMIT ?)",
+                (self.max_searches,),
+            )
+            db.commit()
+
+    def expire(self):
+        """Mark every search stale; the results are kept as a fallback."""
+        with self._lock:
+            db = self._db()
+            db.execute("UPDATE searches SET fetched_at = 0")
+            db.commit()
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM searches")
+            db.commit()
+
+    def stats(self):
+        with self._lock:
+            searches, results = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(json_array_length(entries)), 0) FROM searches"
+            ).fetchone()
+        return {"searches": searches, "results": results}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache(Config.ARXIV_SEARCH_CACHE_PATH, Config.ARXIV_SEARCH_MAX_SEARCHES)
+        return _cache
+
+
+def parse_page(xml_text):
+    """([(paper id, entry XML), ...], total results) from an API response.
+    Raises ET.ParseError on malformed XML."""
+    root = ET.fromstring(xml_text)
+    entries = []
+    for entry in root.findall("atom:entry", _NS):
+        paper_id = entry.findtext("atom:id", "", _NS)
+        if paper_id.startswith("http://arxiv.org/api/"):
+            continue  # the API reports errors as an entry
+        entries.append([paper_id, ET.tostring(entry, encoding="unicode")])
+    total = root.findtext("opensearch:totalResults", None, _NS)
+    return entries, int(total) if total and total.isdigit() else None
+
+
+def build_feed(entries, total):
+    """An Atom feed holding `entries`, in the shape the arXiv API returns."""
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<feed xmlns="{ATOM}" xmlns:opensearch="{OPENSEARCH}">\n'
+        f"<opensearch:totalResults>{total or len(entries)}</opensearch:totalResults>\n"
+        + "\n".join(xml for _, xml in entries)
+        + "\n</feed>\n"
+    )
+
+
+def search(query, max_results, fetch):
+    """First `max_results` results for an arXiv search_query as Atom XML.
+
+    fetch(start, count) returns the API response for that range (or None
+    on failure) and is only called for results that aren't cached yet.
+    """
+    cache = get_cache()
+    now = time.time()
+    cached = cache.lookup(query)
+    fallback = cached
+    if cached and now - cached["fetched_at"] > Config.ARXIV_SEARCH_TTL:
+        cached = None
+    entries = cached["entries"] if cached else []
+    total = cached["total"] if cached else None
+
+    if cached and (len(entries) >= max_results or (total is not None and len(entries) >= total)):
+        metrics.record_cache("arxiv_search", True)
+        metrics.increment("arxiv_search_cache_total", outcome="hit")
+        return build_feed(entries[:max_results], total)
+
+    wanted = max_results - len(entries)
+    xml_text = fetch(len(entries), wanted)
+    page = None
+    if xml_text is not None:
+        try:
+            page, page_total = parse_page(xml_text)
+        except ET.ParseError:
+            metrics.record_error("parse.arxiv")
+    if page is None:
+        if fallback:
+            metrics.increment("arxiv_search_cache_total", outcome="stale_on_error")
+            return build_feed(fallback["entries"][:max_results], fallback["total"])
+        return None
+
+    # The API returns short or empty pages at random, so totalResults is
+    # trusted over the page length. A page that comes up short of it is
+    # kept as a partial result, and the next request fetches the rest.
+    total = page_total if page_total is not None else total
+    if not page and (total is None or total > len(entries)):
+        metrics.increment("arxiv_search_cache_total", outcome="short_page")
+        if fallback:
+            return build_feed(fallback["entries"][:max_results], fallback["total"])
+        return build_feed(entries[:max_results], total)
+
+    metrics.record_cache("arxiv_search", False)
+    metrics.increment("arxiv_search_cache_total", outcome="extended" if cached else "miss")
+    seen = {paper_id for paper_id, _ in entries}
+    entries = entries + [e for e in page if e[0] not in seen]
+    cache.store(query, entries, total, cached["fetched_at"] if cached else now)
+    return build_feed(entries[:max_results], total)
+
+
+def expire():
+    get_cache().expire()
+
+
+def clear():
+    get_cache().clear()
@@ -0,0 +1,4 @@
+"""
+Offline benchmarks and load tests for the Tech Insight fetch, parse and
+summarization paths.
+"""
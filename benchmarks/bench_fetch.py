@@ -0,0 +1,182 @@
+"""
+Offline benchmarks for the fetch-and-parse paths.
+
+Runs against benchmarks/server.py, so no network access is needed:
+
+    python -m benchmarks.bench_fetch --iterations 20 --latency-ms 50
+
+Each case reports throughput, latency percentiles and peak traced memory.
+In-process and HTTP caches are cleared before every iteration so cold paths
+are measured, except for the "(304)" case, which keeps the disk cache warm
+and measures conditional revalidation of unchanged pages, and the "(cached
+superset)" case, which repeats the arXiv search from the persistent search
+cache.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# summarizer reads the key at import time; the benchmarks never call Gemini.
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from benchmarks.server import FixtureServer, LARGE_PAGE_SIZES
+
+
+def _clear(func):
+    clear = getattr(func, "clear", None)
+    if clear:
+        clear()
+
+
+def _cases(base_url):
+    import scraper
+    import ii
+    import app2
+    import http_cache
+    import hn_comments
+    import arxiv_cache
+
+    scraper.LATEST_URL = f"{base_url}/latest/"
+    ii.HN_BASE_URL = f"{base_url}/hn/"
+    app2.ARXIV_API_URL = f"{base_url}/api/query"
+    hn_comments.HN_API_URL = f"{base_url}/hn/api/v0/"
+
+    def latest_news():
+        http_cache.clear()
+        return len(scraper.get_latest_news(max_articles=20, delay=(0, 0)))
+
+    def fetch_all_large():
+        total = 0
+        for n in range(len(LARGE_PAGE_SIZES)):
+            content = ii.fetch_article_content(f"{base_url}/large/{n}")
+            total += 1 if content else 0
+        return total
+
+    def hacker_news():
+        _clear(ii.fetch_hacker_news_items)
+        return len(ii.fetch_hacker_news_items())
+
+    def arxiv_search():
+        _clear(app2.search_arxiv)
+        arxiv_cache.clear()
+        return len(app2.parse_arxiv_response(app2.search_arxiv("transformer", 10, "all")))
+
+    def arxiv_search_refined():
+        # A differently-cased, smaller repeat of the last search: served
+        # from the persistent cache without a request
+        _clear(app2.search_arxiv)
+        return len(app2.parse_arxiv_response(app2.search_arxiv("Transformer ", 5, "all")))
+
+    def article_content():
+        _clear(ii.fetch_article_content)
+        http_cache.clear()
+        return fetch_all_large()
+
+    def article_content_revalidated():
+        _clear(ii.fetch_article_content)
+        return fetch_all_large()
+
+    def hn_thread():
+        _clear(hn_comments.fetch_item)
+        thread = hn_comments.fetch_thread(44100000)
+        hn_comments.format_thread(thread)
+        return thread["loaded"]
+
+    return {
+        "get_latest_news": latest_news,
+        "fetch_hacker_news_items": hacker_news,
+        "search_arxiv+parse": arxiv_search,
+        "search_arxiv (cached superset)": arxiv_search_refined,
+        "fetch_article_content": article_content,
+        "fetch_article_content (304)": article_content_revalidated,
+        "hn fetch_thread (600)": hn_thread,
+    }
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_case(func, iterations, warmup=1):
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    items = 0
+    for _ in range(iterations):
+        gc.collect()
+        start = time.perf_counter()
+        items += func()
+        timings.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate pass; tracemalloc slows things down too
+    # much to share a run with the timings.
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(timings)
+    return {
+        "iterations": iterations,
+        "items_per_iter": items / iterations,
+        "throughput_items_s": items / total if total else 0.0,
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": _percentile(timings, 0.50) * 1000,
+        "p95_ms": _percentile(timings, 0.95) * 1000,
+        "p99_ms": _percentile(timings, 0.99) * 1000,
+        "peak_mem_mb": peak / (1024 * 1024),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Per-request latency added by the stand-in server")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency, uniform in [0, jitter]")
+    parser.add_argument("--only", action="append", help="Run only the named case (repeatable)")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    from config import Config
+    scratch = tempfile.mkdtemp(prefix="bench-fetch-")
+    Config.HTTP_CACHE_PATH = os.path.join(scratch, "http.sqlite")
+    Config.ARXIV_SEARCH_CACHE_PATH = os.path.join(scratch, "arxiv_search.sqlite")
+
+    results = {}
+    with FixtureServer(args.latency_ms, args.jitter_ms) as server:
+        cases = _cases(server.base_url)
+        for name, func in cases.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = run_case(func, args.iterations)
+
+        print(f"{'case':<30}{'items/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+        for name, r in results.items():
+            print(
+                f"{name:<30}{r['throughput_items_s']:>10.1f}{r['mean_ms']:>10.1f}{r['p50_ms']:>10.1f}"
+                f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['peak_mem_mb']:>10.2f}"
+            )
+        print(
+            f"\n{server.requests_served} requests served ({server.not_modified} not modified) "
+            f"at {args.latency_ms:g} ms (+{args.jitter_ms:g} ms jitter)"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Offline check of the HTTP cache's freshness rules.
+
+Runs http_cache.freshness_lifetime over response headers seen in the wild,
+including malformed ones (valueless max-age, junk Age values), and times it:
+
+    python -m benchmarks.bench_freshness
+
+Exits non-zero if any case gives a different lifetime than expected or raises.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+NOW = 1_700_000_000.0
+DATE = "Tue, 14 Nov 2023 22:13:20 GMT"  # NOW
+# (name, response headers, expected lifetime in seconds; None = not stored)
+CASES = [
+    ("max-age", {"Cache-Control": "max-age=300"}, 300),
+    ("s-maxage wins", {"Cache-Control": "max-age=300, s-maxage=60"}, 60),
+    ("age subtracted", {"Cache-Control": "max-age=300", "Age": "100"}, 200),
+    ("junk age", {"Cache-Control": "max-age=300", "Age": "abc"}, 300),
+    ("negative age", {"Cache-Control": "max-age=300", "Age": "-5"}, 300),
+    ("list age", {"Cache-Control": "max-age=300", "Age": "10, 20"}, 290),
+    ("valueless max-age", {"Cache-Control": "max-age"}, 0),
+    ("empty max-age", {"Cache-Control": "max-age="}, 0),
+    ("valueless s-maxage", {"Cache-Control": "s-maxage, public"}, 0),
+    ("valueless s-maxage, max-age", {"Cache-Control": "s-maxage, max-age=120"}, 120),
+    ("no-store", {"Cache-Control": "no-store, max-age=300"}, None),
+    ("no-cache", {"Cache-Control": "no-cache"}, 0),
+    ("expires", {"Date": DATE, "Expires": "Tue, 14 Nov 2023 23:13:20 GMT"}, 3600),
+    ("junk expires", {"Date": DATE, "Expires": "0"}, 0),
+    ("heuristic", {"Date": DATE, "Last-Modified": "Tue, 14 Nov 2023 12:13:20 GMT"}, 3600),
+    ("nothing", {}, 0),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000, help="Timed calls per case")
+    args = parser.parse_args(argv)
+
+    import http_cache
+
+    wrong = 0
+    for name, headers, expected in CASES:
+        try:
+            lifetime = http_cache.freshness_lifetime(headers, NOW)
+        except Exception as e:
+            lifetime = f"raised {type(e).__name__}"
+        ok = lifetime == expected
+        wrong += not ok
+        print(f"{'ok ' if ok else 'BAD'} {name:<30}{lifetime!s:<24}expected {expected}")
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        for _, headers, _ in CASES:
+            try:
+                http_cache.freshness_lifetime(headers, NOW)
+            except Exception:
+                pass
+    per_call = (time.perf_counter() - start) / (args.iterations * len(CASES))
+    print(f"{len(CASES) - wrong}/{len(CASES)} cases as expected ({per_call * 1e6:.1f} µs per call)")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
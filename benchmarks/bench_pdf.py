@@ -0,0 +1,99 @@
+"""
+Offline benchmark for arXiv PDF ingestion (download + process-pool parse).
+
+Papers are synthesized by benchmarks/server.py, so no network is needed:
+
+    python -m benchmarks.bench_pdf --papers 8 --pages 20 --workers 2
+
+Local PDFs can be parsed through the same pool instead:
+
+    python -m benchmarks.bench_pdf --files paper1.pdf paper2.pdf
+
+Reports wall-clock pages/sec overall and pages/sec for each worker process.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.server import FixtureServer
+
+
+def _ingest_urls(pdf_ingest, urls, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        texts = list(pool.map(pdf_ingest.get_paper_text, urls))
+    return sum(1 for t in texts if t)
+
+
+def _extract_files(pdf_ingest, paths, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(pdf_ingest.extract_in_pool, paths))
+    return sum(1 for r in results if r["text"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=20, help="Pages per synthesized paper")
+    parser.add_argument("--workers", type=int, default=2, help="Extraction processes")
+    parser.add_argument("--concurrency", type=int, default=4, help="Papers requested at once")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Per-request latency added by the stand-in server")
+    parser.add_argument("--files", nargs="+", help="Parse these local PDFs instead of synthesized papers")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    from config import Config
+    Config.PDF_WORKERS = args.workers
+    Config.PDF_CACHE_DIR = tempfile.mkdtemp(prefix="bench-pdf-")
+    Config.PDF_MAX_PAGES = max(Config.PDF_MAX_PAGES, args.pages)
+    import pdf_ingest
+
+    # Start the workers up front so process spawn time is not measured.
+    pool = pdf_ingest.get_pool()
+    for future in [pool.submit(os.getpid) for _ in range(args.workers)]:
+        future.result()
+    pdf_ingest.reset_worker_stats()
+
+    start = time.perf_counter()
+    if args.files:
+        papers = _extract_files(pdf_ingest, args.files, args.concurrency)
+        requests_served = 0
+    else:
+        with FixtureServer(args.latency_ms) as server:
+            urls = [f"{server.base_url}/pdf/bench-{i}?pages={args.pages}" for i in range(args.papers)]
+            papers = _ingest_urls(pdf_ingest, urls, args.concurrency)
+            requests_served = server.requests_served
+    elapsed = time.perf_counter() - start
+    pdf_ingest.shutdown_pool()
+
+    workers = pdf_ingest.worker_stats()
+    pages = sum(w["pages"] for w in workers.values())
+    print(f"{'worker':<10}{'pages':>8}{'busy s':>10}{'pages/s':>10}")
+    for pid, w in sorted(workers.items()):
+        print(f"{pid:<10}{w['pages']:>8}{w['seconds']:>10.2f}{w['pages_per_s']:>10.1f}")
+    print(
+        f"\n{papers} papers, {pages} pages in {elapsed:.2f}s "
+        f"({pages / elapsed if elapsed else 0:.1f} pages/s wall, {args.workers} workers"
+        + (f", {requests_served} requests served)" if not args.files else ")")
+    )
+
+    results = {
+        "papers": papers,
+        "pages": pages,
+        "seconds": elapsed,
+        "pages_per_s": pages / elapsed if elapsed else 0.0,
+        "workers": {str(pid): w for pid, w in workers.items()},
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Offline benchmark for the related-items index.
+
+Builds an index of synthetic topical documents in a temp directory, reopens
+it (as the app does at startup) and measures related-item lookups:
+
+    python -m benchmarks.bench_related --items 100000 --queries 500
+
+Reports build rate, reopen time, lookup p50/p95/max and recall@10 of the
+SimHash shortlist against exact cosine search.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _corpus(items, topics, seed=0):
+    """Documents drawn from overlapping topic vocabularies plus background words."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = list({"".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(30000)})
+    background = vocab[:10000]
+    topic_words = [rng.sample(vocab[10000:], 40) for _ in range(topics)]
+    for i in range(items):
+        words = topic_words[rng.randrange(topics)]
+        title = " ".join(rng.choices(words, k=7))
+        text = " ".join(rng.choice(words) if rng.random() < 0.5 else rng.choice(background) for _ in range(150))
+        yield {"url": f"https://bench.example/{i}", "title": title, "text": text, "source": "bench"}
+
+
+def _recall(index, np, queries, k=10):
+    """Share of the exact top-k (by cosine over every vector) that the
+    shortlist search also returns."""
+    db = index._db()
+    vectors, _ = index._mapped(index._rows(db))
+    matrix = np.asarray(vectors, dtype=np.float32)
+    found = total = 0
+    for row in queries:
+        vector = matrix[row]
+        exact = set(np.argsort(-(matrix @ vector))[:k].tolist())
+        approx = {r for r, _ in index.nearest(vector, k)}
+        found += len(exact & approx)
+        total += k
+    return found / total if total else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=2000, help="Items per add_many call")
+    parser.add_argument("--dir", help="Index directory (default: a temp dir; reused if it exists)")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    import related
+
+    directory = args.dir or tempfile.mkdtemp(prefix="bench-related-")
+    index = related.RelatedIndex(directory)
+
+    start = time.perf_counter()
+    batch = []
+    for item in _corpus(args.items, args.topics):
+        batch.append(item)
+        if len(batch) == args.batch:
+            index.add_many(batch)
+            batch = []
+    index.add_many(batch)
+    build = time.perf_counter() - start
+    entries = index.stats()["entries"]
+
+    # A fresh instance maps the files instead of loading them
+    start = time.perf_counter()
+    index = related.RelatedIndex(directory)
+    index.related("https://bench.example/0")
+    reopen = time.perf_counter() - start
+
+    rng = random.Random(1)
+    queries = [rng.randrange(entries) for _ in range(args.queries)]
+    latencies = []
+    for row in queries:
+        start = time.perf_counter()
+        index.related(f"https://bench.example/{row}")
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    recall = _recall(index, np, queries[:100])
+
+    stats = index.stats()
+    results = {
+        "items": entries,
+        "build_seconds": build,
+        "items_per_s": entries / build if build else 0.0,
+        "reopen_seconds": reopen,
+        "lookup_p50_ms": statistics.median(latencies) * 1000,
+        "lookup_p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "lookup_max_ms": latencies[-1] * 1000,
+        "recall_at_10": recall,
+        "index_mb": stats["bytes"] / 2**20,
+    }
+    print(
+        f"{entries} items indexed in {build:.1f}s ({results['items_per_s']:.0f} items/s), "
+        f"{results['index_mb']:.1f} MB on disk\n"
+        f"reopen + first lookup {reopen * 1000:.1f} ms\n"
+        f"lookup p50 {results['lookup_p50_ms']:.2f} ms  p95 {results['lookup_p95_ms']:.2f} ms  "
+        f"max {results['lookup_max_ms']:.2f} ms over {len(latencies)} queries\n"
+        f"recall@10 vs exact search: {recall:.1%}"
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
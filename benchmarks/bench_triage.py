@@ -0,0 +1,50 @@
+"""
+Offline check of the pre-LLM content triage.
+
+Runs triage.assess over labelled samples (benchmarks/fixtures/triage_samples.json):
+article bodies that talk about subscriptions, consent or cookies, next to
+real cookie walls, paywall stubs, menus and short posts.
+
+    python -m benchmarks.bench_triage
+
+Prints the decision and scores for each sample and exits non-zero if any
+sample is triaged differently from its label.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "triage_samples.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", default=SAMPLES, help="JSON list of {name, expect, text}")
+    args = parser.parse_args(argv)
+
+    import triage
+
+    with open(args.samples, encoding="utf-8") as f:
+        samples = json.load(f)
+
+    wrong = 0
+    start = time.perf_counter()
+    for sample in samples:
+        verdict = triage.assess(sample["text"])
+        ok = verdict["action"] == sample["expect"]
+        wrong += not ok
+        print(
+            f"{'ok ' if ok else 'BAD'} {sample['name']:<28}{verdict['action']:<12}{verdict['reason']:<12}"
+            f"expected {sample['expect']:<12}{verdict['scores']}"
+        )
+    elapsed = time.perf_counter() - start
+    print(f"{len(samples) - wrong}/{len(samples)} samples triaged as labelled ({elapsed * 1000:.1f} ms)")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
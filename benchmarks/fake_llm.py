@@ -0,0 +1,103 @@
+"""
+A stand-in for the Gemini chat model with configurable latency, token rate
+and error injection. Install it with llm_client.set_llm(FakeChatModel(...)).
+"""
+import random
+import threading
+import time
+from collections import deque
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class RateLimitError(Exception):
+    """Mimics the 429 ResourceExhausted error raised by the Gemini client."""
+
+    def __init__(self, message="429 Resource has been exhausted (e.g. check quota)."):
+        super().__init__(message)
+        self.status_code = 429
+
+
+class FakeChatModel:
+    """Chat model double.
+
+    latency_ms      time to first token
+    tokens_per_s    generation speed; output length follows the prompt's
+                    "about N words" instruction when present
+    error_rate      probability of a generic failure
+    rate_limit_rate probability of an injected 429
+    rpm             optional requests-per-minute quota; calls above it fail
+                    with a 429 just like the real API
+    """
+
+    def __init__(self, latency_ms=300, tokens_per_s=200, error_rate=0.0,
+                 rate_limit_rate=0.0, rpm=None, seed=None):
+        self.latency_ms = latency_ms
+        self.tokens_per_s = tokens_per_s
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def _output_tokens(self, prompt):
+        marker = "should be about "
+        idx = prompt.find(marker)
+        if idx != -1:
+            words = prompt[idx + len(marker):].split(" ", 1)[0]
+            if words.isdigit():
+                return int(int(words) * 1.3)
+        return 120  # a 3-5 sentence summary
+
+    def invoke(self, prompt, *args, **kwargs):
+        prompt = str(prompt)
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += len(prompt) // 4
+            roll = self._random.random()
+            limited = roll < self.rate_limit_rate
+            if self.rpm:
+                while self._recent and now - self._recent[0] > 60:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rpm:
+                    limited = True
+                else:
+                    self._recent.append(now)
+            failed = not limited and roll < self.rate_limit_rate + self.error_rate
+            if limited:
+                self.rate_limited += 1
+            elif failed:
+                self.errors += 1
+
+        if limited:
+            time.sleep(0.02)
+            raise RateLimitError()
+        time.sleep(self.latency_ms / 1000)
+        if failed:
+            raise RuntimeError("503 The model is overloaded. Please try again later.")
+
+        tokens = self._output_tokens(prompt)
+        time.sleep(tokens / self.tokens_per_s)
+        with self._lock:
+            self.output_tokens += tokens
+        return FakeMessage(" ".join(["lorem"] * int(tokens / 1.3)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "rate_limited": self.rate_limited,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+            }
@@ -0,0 +1,230 @@
+"""
+Load test: N simulated sessions driving the News, Hacker News, TechTalker
+and Bookmarks flows concurrently against the fixture server and a fake LLM.
+
+    python -m benchmarks.loadtest --sessions 25 --iterations 8 \
+        --llm-latency-ms 400 --token-rate 150 --rate-limit-rate 0.05
+
+Each flow calls the same cached functions its tab calls, so Streamlit's
+process-wide caches are shared between sessions exactly as in production.
+Reports throughput, tail latency per flow, cache hit ratios and LLM calls.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-loadtest")
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.server import FixtureServer
+
+TOPICS = ["artificial intelligence", "ai chips", "electric vehicles", "space launch", "open source models"]
+DEFAULT_MIX = "news=3,hn=3,techtalker=1,bookmarks=1"
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _is_llm_failure(text):
+    return isinstance(text, str) and text.startswith(("[Could not summarize", "Could not summarize"))
+
+
+def build_flows(base_url, news_page_size):
+    import streamlit as st
+    import scraper
+    import ii
+    import app2
+    import retrieval
+    import aiscraper
+    from components import news, bookmarks
+    from summarizer import summarize_text
+
+    scraper.LATEST_URL = f"{base_url}/latest/"
+    scraper.ARTICLE_DELAY = (0, 0)
+    ii.HN_BASE_URL = f"{base_url}/hn/"
+    app2.ARXIV_API_URL = f"{base_url}/api/query"
+
+    def fake_ddgs(topic, limit=retrieval.MAX_HITS_PER_SOURCE):
+        return [
+            {
+                "title": f"{topic.title()} roundup #{i}",
+                "url": f"{base_url}/2025/06/0{i + 1}/{topic.replace(' ', '-')}-roundup/",
+                "snippet": f"Latest developments in {topic}: funding, launches and research. " * 3,
+            }
+            for i in range(limit)
+        ]
+
+    retrieval.SOURCES = {**retrieval.SOURCES, "ddgs": fake_ddgs}
+
+    def news_flow(rng):
+        failures = 0
+        for article in news.load_article_store().filter()[:news_page_size]:
+            failures += _is_llm_failure(news.get_cached_summary(article.content))
+        return failures
+
+    def hn_flow(rng):
+        items = ii.fetch_hacker_news_items()
+        page = rng.randrange(max(1, len(items) // 10))
+        item = rng.choice(items[page * 10:page * 10 + 10])
+        content = ii.fetch_article_content(item["link"])
+        return _is_llm_failure(summarize_text(content)) if content else 0
+
+    def techtalker_flow(rng):
+        output = aiscraper.generate_explainer(rng.choice(TOPICS), rng.randint(0, 10), 500)
+        return 0 if output else 1
+
+    def bookmarks_flow(rng):
+        url = f"{base_url}/large/{rng.randrange(3)}"
+        content = bookmarks.fetch_article_content(url)
+        return _is_llm_failure(bookmarks.get_cached_summary(content)) if content else 1
+
+    return st, {
+        "news": news_flow,
+        "hn": hn_flow,
+        "techtalker": techtalker_flow,
+        "bookmarks": bookmarks_flow,
+    }
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def run(args):
+    import llm_client
+    import metrics
+    import object_cache
+    from config import Config
+
+    if args.quota_rpm:
+        Config.LLM_REQUESTS_PER_MINUTE = args.quota_rpm
+    # Fixture URLs change port every run; keep them out of the real HTTP cache
+    # and related-items index
+    scratch = tempfile.mkdtemp(prefix="loadtest-")
+    Config.HTTP_CACHE_PATH = os.path.join(scratch, "http.sqlite")
+    Config.RELATED_INDEX_DIR = os.path.join(scratch, "related")
+    Config.ARXIV_SEARCH_CACHE_PATH = os.path.join(scratch, "arxiv_search.sqlite")
+
+    fake = FakeChatModel(
+        latency_ms=args.llm_latency_ms,
+        tokens_per_s=args.token_rate,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        rpm=args.rpm,
+        seed=args.seed,
+    )
+    llm_client.set_llm(fake)
+
+    results = {}
+    lock = threading.Lock()
+
+    with FixtureServer(args.latency_ms, args.jitter_ms) as server:
+        st, flows = build_flows(server.base_url, args.news_page_size)
+        mix = parse_mix(args.mix)
+        unknown = set(mix) - set(flows)
+        if unknown:
+            raise SystemExit(f"Unknown flows in --mix: {', '.join(sorted(unknown))}")
+        if not args.warm:
+            object_cache.clear()
+        metrics.reset()
+
+        names = list(mix)
+        weights = [mix[n] for n in names]
+
+        def session(session_id):
+            rng = random.Random(args.seed + session_id if args.seed is not None else None)
+            for _ in range(args.iterations):
+                name = rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                try:
+                    failures = flows[name](rng)
+                except Exception as e:
+                    failures = 1
+                    print(f"[session {session_id}] {name} raised {type(e).__name__}: {e}")
+                elapsed = time.perf_counter() - start
+                with lock:
+                    entry = results.setdefault(name, {"timings": [], "failures": 0})
+                    entry["timings"].append(elapsed)
+                    entry["failures"] += failures
+                if args.think_ms:
+                    time.sleep(rng.uniform(0, args.think_ms) / 1000)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=session, args=(i,), name=f"session-{i}") for i in range(args.sessions)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+        requests_served = server.requests_served
+
+    report(results, wall, fake.stats(), metrics.snapshot(), requests_served, args)
+    return results
+
+
+def report(results, wall, llm_stats, snap, requests_served, args):
+    total = sum(len(r["timings"]) for r in results.values())
+    print(f"\n{args.sessions} sessions x {args.iterations} iterations: {total} flows in {wall:.2f}s "
+          f"({total / wall:.2f} flows/s)\n")
+    print(f"{'flow':<12}{'count':>7}{'fail':>6}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'max s':>9}")
+    for name, r in sorted(results.items()):
+        t = r["timings"]
+        print(f"{name:<12}{len(t):>7}{r['failures']:>6}{statistics.median(t):>9.3f}"
+              f"{_percentile(t, 0.95):>9.3f}{_percentile(t, 0.99):>9.3f}{max(t):>9.3f}")
+
+    print("\nCaches")
+    for name, c in snap["caches"].items():
+        print(f"  {name:<28}{c['hits']:>6} hits {c['misses']:>6} misses  {c['hit_rate']:.0%}")
+
+    coalesced = {k: v for k, v in snap["counters"].items() if k.startswith("singleflight_coalesced_total")}
+    if coalesced:
+        print("\nCoalesced in-flight duplicates")
+        for name, value in coalesced.items():
+            print(f"  {name}: {value:g}")
+
+    print("\nLLM")
+    print(f"  calls {llm_stats['calls']}  errors {llm_stats['errors']}  429s {llm_stats['rate_limited']}  "
+          f"prompt tokens {llm_stats['prompt_tokens']}  output tokens {llm_stats['output_tokens']}")
+    for stage in ("llm.summarize", "llm.techtalker"):
+        s = snap["stages"].get(stage)
+        if s:
+            print(f"  {stage:<16} p50 {s['p50']:.3f}s  p95 {s['p95']:.3f}s  errors {s['errors']}")
+    print(f"\nFixture server requests: {requests_served}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent session load test with a fake LLM backend.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=5, help="Flows per session")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Flow weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--think-ms", type=float, default=200, help="Max random pause between flows")
+    parser.add_argument("--news-page-size", type=int, default=5, help="Articles summarized per News visit")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Fixture server latency")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--token-rate", type=float, default=200, help="Fake LLM output tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of an injected 429")
+    parser.add_argument("--rpm", type=int, default=None, help="Fake requests-per-minute quota")
+    parser.add_argument("--quota-rpm", type=float, default=None,
+                        help="Override Config.LLM_REQUESTS_PER_MINUTE for the scheduler")
+    parser.add_argument("--warm", action="store_true", help="Keep existing caches instead of starting cold")
+    parser.add_argument("--seed", type=int, default=None)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Local stand-in for TechCrunch, Hacker News and the arXiv API that replays
+the recorded fixtures with configurable latency, so benchmarks run offline.
+
+Routes:
+    /latest/                  TechCrunch listing page
+    /latest/page/<n>/         Older listing pages (n = 2..LISTING_PAGES)
+    /YYYY/MM/DD/<slug>/       TechCrunch article page
+    /hn/                      Hacker News front page
+    /hn/item?id=...           Hacker News self post (article fixture)
+    /hn/api/v0/item/<id>.json Hacker News API item; stories whose id ends in 0
+                              have a 600-comment thread, others 40
+    /api/query                arXiv Atom search response; honors start and
+                              max_results over ARXIV_RESULTS synthesized papers
+    /large/<n>                Large article page (n = 0, 1, 2)
+    /pdf/<id>?pages=N         Synthesized N-page paper PDF (default 12)
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Approximate sizes of the synthesized large article pages, in bytes.
+LARGE_PAGE_SIZES = (256 * 1024, 1024 * 1024, 3 * 1024 * 1024)
+
+# Papers matched by every arXiv query (the fixture's 10, repeated with new ids)
+ARXIV_RESULTS = 200
+
+# Paginated listing: 20 cards per page, six hours apart, newest first.
+LISTING_PAGES = 50
+LISTING_NEWEST = datetime(2025, 6, 20, 10, tzinfo=timezone(timedelta(hours=-7)))
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def build_large_page(target_size, article_html):
+    """Grow the article fixture to roughly target_size bytes.
+
+    Real long-reads are mostly markup: inline scripts, nested wrappers and
+    related-article rails around a few hundred paragraphs, so the filler
+    mixes both.
+    """
+    paragraphs = re.findall(r'<p class="wp-block-paragraph">.*?</p>', article_html)
+    rail = (
+        '<div class="related-rail"><div class="related-rail__item"><a href="/x/">'
+        'Related story headline goes here</a><span class="meta">3 min read</span></div></div>\n'
+        '<script>window.dataLayer=window.dataLayer||[];dataLayer.push({"event":"scroll","depth":%d});</script>\n'
+    )
+    chunks = []
+    size = len(article_html)
+    i = 0
+    while size < target_size:
+        chunk = paragraphs[i % len(paragraphs)] + '\n' + (rail % i if i % 4 == 0 else '')
+        chunks.append(chunk)
+        size += len(chunk)
+        i += 1
+    marker = '</div>\n      <div class="tc23-post-relevant-terms">'
+    return article_html.replace(marker, '\n'.join(chunks) + marker, 1)
+
+
+def build_arxiv_page(feed_xml, start, max_results, total=ARXIV_RESULTS):
+    """Slice [start, start + max_results) of a result set made by repeating
+    the fixture's entries under fresh paper ids."""
+    head, _, rest = feed_xml.partition('<entry>')
+    entries = re.findall(r'<entry>.*?</entry>', '<entry>' + rest, re.S)
+    head = re.sub(r'(<opensearch:totalResults[^>]*>)\d+', rf'\g<1>{total}', head)
+    head = re.sub(r'(<opensearch:startIndex[^>]*>)\d+', rf'\g<1>{start}', head)
+    head = re.sub(r'(<opensearch:itemsPerPage[^>]*>)\d+', rf'\g<1>{max_results}', head)
+    page = []
+    for i in range(start, min(start + max_results, total)):
+        entry = entries[i % len(entries)]
+        page.append(re.sub(r'2506\.\d{5}', f'2506.{i + 1:05d}', entry))
+    return head + '\n  '.join(page) + '\n</feed>\n'
+
+
+def build_listing_page(listing_html, page, base_url, pages=LISTING_PAGES):
+    """Page `page` of the listing: the first page's cards with unique slugs
+    and dates further back, linking to the next page until the last one."""
+    counter = itertools.count()
+
+    def card(match):
+        published = LISTING_NEWEST - timedelta(hours=6 * ((page - 1) * 20 + next(counter)))
+        block = re.sub(
+            r'/\d{4}/\d{2}/\d{2}/([\w-]+)/',
+            lambda m: f'/{published:%Y/%m/%d}/{m.group(1)}-p{page}/',
+            match.group(0),
+        )
+        return re.sub(r'datetime="[^"]+"', f'datetime="{published.isoformat()}"', block)
+
+    html = re.sub(r'<div class="loop-card .*?</time>', card, listing_html, flags=re.S)
+    next_link = (
+        f'<a class="wp-block-query-pagination-next" href="{base_url}/latest/page/{page + 1}/">Next</a>'
+        if page < pages else ''
+    )
+    return re.sub(r'<a class="wp-block-query-pagination-next"[^>]*>Next</a>', next_link, html)
+
+
+def build_hn_thread(story_id, paragraphs):
+    """Synthesize a story and its comment tree as API items keyed by id.
+    Comment ids are story_id * 1000 + n so the story can be recovered."""
+    rng = random.Random(story_id)
+    size = 600 if story_id % 10 == 0 else 40
+    items = {story_id: {'id': story_id, 'type': 'story', 'by': 'poster', 'title': f'Story {story_id}',
+                        'kids': [], 'descendants': size}}
+    comment_ids = []
+    for n in range(1, size + 1):
+        comment_id = story_id * 1000 + n
+        # A sixth of the comments are top-level; replies favour recent comments
+        if n <= max(1, size // 6) or not comment_ids:
+            parent = story_id
+        else:
+            parent = comment_ids[int(len(comment_ids) * rng.random() ** 0.3) - 1]
+        if n % 50 == 0:
+            item = {'id': comment_id, 'deleted': True, 'parent': parent}
+        else:
+            text = rng.choice(paragraphs)
+            item = {'id': comment_id, 'type': 'comment', 'by': f'user{rng.randrange(200)}',
+                    'text': f'<p>{text[:rng.randrange(80, 400)]}</p>', 'parent': parent}
+        items[comment_id] = item
+        items[parent].setdefault('kids', []).append(comment_id)
+        comment_ids.append(comment_id)
+    return items
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(pages, paragraphs, lines_per_page=45, chars_per_line=90):
+    """A minimal but valid text PDF with `pages` pages of wrapped paragraphs,
+    so PDF extraction can be benchmarked without shipping binary fixtures."""
+    words = ' '.join(paragraphs).split()
+    lines = []
+    line = ''
+    while len(lines) < pages * lines_per_page:
+        for word in words:
+            if len(line) + len(word) + 1 > chars_per_line:
+                lines.append(line)
+                line = ''
+            line = f'{line} {word}' if line else word
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in once the page ids are known
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    page_ids = []
+    for p in range(pages):
+        body = '\n'.join(
+            f'({_pdf_escape(l)}) Tj T*' for l in lines[p * lines_per_page:(p + 1) * lines_per_page]
+        )
+        stream = f'BT /F1 10 Tf 12 TL 50 760 Td\n{body}\nET'.encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        page_ids.append(len(objects))
+    kids = ' '.join(f'{i} 0 R' for i in page_ids).encode()
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, pages)
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, obj)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+class FixtureServer:
+    """Threaded HTTP server replaying fixtures; use as a context manager."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, port=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests_served = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{self._httpd.server_address[1]}'
+        self._pages = self._load_pages()
+
+    def _load_pages(self):
+        base = self.base_url
+        article = load_fixture('techcrunch_article.html').replace('{base}', base)
+        self._paragraphs = [
+            re.sub(r'<[^>]+>', '', p)
+            for p in re.findall(r'<p class="wp-block-paragraph">.*?</p>', article)
+        ]
+        self._pdfs = {}
+        self._listing_pages = {}
+        self._hn_threads = {}
+        latest = load_fixture('techcrunch_latest.html').replace('{base}', base)
+        return {
+            'latest_html': latest,
+            'latest': latest.encode(),
+            'article': article,
+            'hn': load_fixture('hn_front.html').replace('{base}', base).encode(),
+            'arxiv': load_fixture('arxiv_query.xml'),
+            'large': [
+                build_large_page(size, article.replace('{title}', f'Large article {n}')).encode()
+                for n, size in enumerate(LARGE_PAGE_SIZES)
+            ],
+        }
+
+    def route(self, path):
+        """Return (content type, body) for a request path, or None for 404."""
+        parts = urlsplit(path)
+        path = parts.path
+        if path in ('/latest', '/latest/'):
+            return 'text/html; charset=UTF-8', self._pages['latest']
+        match = re.fullmatch(r'/latest/page/(\d+)/?', path)
+        if match and 2 <= int(match.group(1)) <= LISTING_PAGES:
+            page = int(match.group(1))
+            with self._lock:
+                if page not in self._listing_pages:
+                    self._listing_pages[page] = build_listing_page(
+                        self._pages['latest_html'], page, self.base_url
+                    ).encode()
+            return 'text/html; charset=UTF-8', self._listing_pages[page]
+        match = re.fullmatch(r'/hn/api/v0/item/(\d+)\.json', path)
+        if match:
+            item_id = int(match.group(1))
+            story_id = item_id if item_id < 10 ** 9 else item_id // 1000
+            with self._lock:
+                if story_id not in self._hn_threads:
+                    self._hn_threads[story_id] = build_hn_thread(story_id, self._paragraphs)
+            item = self._hn_threads[story_id].get(item_id)
+            return 'application/json; charset=utf-8', json.dumps(item).encode()
+        if path in ('/hn', '/hn/'):
+            return 'text/html; charset=utf-8', self._pages['hn']
+        if path == '/hn/item':
+            return 'text/html; charset=utf-8', self._pages['article'].replace('{title}', 'Hacker News item').encode()
+        if path == '/api/query':
+            query = parse_qs(parts.query)
+            start = int(query.get('start', ['0'])[0])
+            max_results = int(query.get('max_results', ['10'])[0])
+            page = build_arxiv_page(self._pages['arxiv'], start, max_results)
+            return 'application/atom+xml; charset=utf-8', page.encode()
+        match = re.fullmatch(r'/large/(\d+)/?', path)
+        if match and int(match.group(1)) < len(self._pages['large']):
+            return 'text/html; charset=UTF-8', self._pages['large'][int(match.group(1))]
+        match = re.fullmatch(r'/pdf/([\w.-]+?)(\.pdf)?', path)
+        if match:
+            pages = int(parse_qs(parts.query).get('pages', ['12'])[0])
+            with self._lock:
+                if pages not in self._pdfs:
+                    self._pdfs[pages] = build_pdf(pages, self._paragraphs)
+            return 'application/pdf', self._pdfs[pages]
+        match = re.fullmatch(r'/\d{4}/\d{2}/\d{2}/([\w-]+)/?', path)
+        if match:
+            title = match.group(1).replace('-', ' ').capitalize()
+            return 'text/html; charset=UTF-8', self._pages['article'].replace('{title}', title).encode()
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                delay = server.latency_ms + random.uniform(0, server.jitter_ms)
+                if delay:
+                    time.sleep(delay / 1000)
+                with server._lock:
+                    server.requests_served += 1
+                routed = server.route(self.path)
+                if routed is None:
+                    self.send_error(404)
+                    return
+                content_type, body = routed
+                # Always revalidate, so HTTP caches exercise the 304 path
+                etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, name='fixture-server', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve benchmark fixtures locally.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    args = parser.parse_args()
+    with FixtureServer(args.latency_ms, args.jitter_ms, args.port) as fixture_server:
+        print(f'Serving fixtures at {fixture_server.base_url} (Ctrl+C to stop)')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -2,7 +2,15 @@ import streamlit as st
 from datetime import datetime
 import requests
 from bs4 import BeautifulSoup
-from summarizer import summarize_text
+from summarizer import summarize_text, summarize_long_text
+from ii import extract_paragraphs
+import metrics
+import profiler
+from singleflight import coalesce
+from object_cache import shared_cache
+import http_cache
+from pdf_ingest import get_paper_text, PDFIngestError
+from utils import render_related
 
 def save_bookmark(item, item_type="article"):
     """Save an item to bookmarks."""
@@ -43,24 +51,35 @@ def remove_bookmark(bookmark):
         st.error(f"Error removing bookmark: {str(e)}")
         return False
 
+# Button callbacks run before the bookmarks fragment reruns, so the list is
+# already up to date when it is redrawn
+def _clear_bookmarks():
+    if st.session_state.bookmarks:
+        st.session_state.bookmarks = []
+        st.toast("All bookmarks cleared!")
+
+def _remove_and_notify(bookmark):
+    if remove_bookmark(bookmark):
+        st.toast("Bookmark removed!")
+
 # Cache article content fetching for 24 hours since content rarely changes
-@st.cache_data(ttl=86400)
+@coalesce("bookmark_article_content")
+@shared_cache("bookmark_article_content", ttl=86400, namespace="bodies")
 def fetch_article_content(url):
     """Fetch and cache article content."""
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        article_resp = requests.get(url, headers=headers, timeout=10)
-        article_resp.raise_for_status()
-        article_soup = BeautifulSoup(article_resp.text, 'html.parser')
-        paragraphs = article_soup.find_all('p')
-        return '\n'.join(p.get_text(strip=True) for p in paragraphs)
+        with metrics.timed("fetch.bookmark_article"):
+            article_resp = http_cache.get(url, headers=headers, timeout=10)
+            article_resp.raise_for_status()
+        return extract_paragraphs(article_resp.text)
     except Exception as e:
         return None
 
-# Cache summaries for 24 hours since they don't change
-@st.cache_data(ttl=86400)
+# summarize_text caches successful summaries for 24 hours; failures
+# (e.g. requests shed by the LLM scheduler) are not cached so they can retry
 def get_cached_summary(content):
     """Get cached summary of content."""
     try:
@@ -68,6 +87,9 @@ def get_cached_summary(content):
     except Exception as e:
         return f"Could not summarize: {str(e)}"
 
+@st.fragment
+@profiler.profiled("render_bookmarks_tab")
+@metrics.timed("render.bookmarks")
 def render_bookmarks_tab():
     st.title("🔖 Bookmarks")
     
@@ -80,11 +102,7 @@ def render_bookmarks_tab():
         return
     
     # Add clear all button
-    if st.button("🗑️ Clear All Bookmarks", type="primary"):
-        if st.session_state.bookmarks:
-            st.session_state.bookmarks = []
-            st.success("All bookmarks cleared!")
-            st.rerun()
+    st.button("🗑️ Clear All Bookmarks", type="primary", on_click=_clear_bookmarks)
     
     # Group bookmarks by type
     bookmarks_by_type = {}
@@ -122,6 +140,16 @@ def render_bookmarks_tab():
                             else:
                                 st.warning("Could not load abstract.")
                     
+                    # Full text is parsed in a worker process and cached by paper id
+                    if bookmark.get('pdf_link') and st.button("📖 Summarize Full Paper", key=f"load_paper_{idx}"):
+                        with st.spinner("Reading the full paper..."):
+                            try:
+                                text = get_paper_text(bookmark['pdf_link'], bookmark.get('paper_id'))
+                                st.markdown("**Full Paper Summary:**")
+                                st.markdown(summarize_long_text(text))
+                            except PDFIngestError as e:
+                                st.warning(f"Could not read the PDF: {str(e)}")
+                    
                     # Display links
                     col1, col2 = st.columns(2)
                     with col1:
@@ -146,13 +174,15 @@ def render_bookmarks_tab():
                     if bookmark.get('url'):
                         st.markdown(f"[🔗 Read More]({bookmark['url']})")
                 
+                render_related(bookmark.get('url', ''), bookmark['title'], bookmark.get('content', ''))
+                
                 # Add remove button with confirmation
                 col1, col2 = st.columns([3, 1])
                 with col2:
-                    if st.button("🗑️ Remove", key=f"remove_{bookmark_type}_{idx}", type="secondary"):
-                        if remove_bookmark(bookmark):
-                            st.success("Bookmark removed!")
-                            st.rerun()
+                    st.button(
+                        "🗑️ Remove", key=f"remove_{bookmark_type}_{idx}", type="secondary",
+                        on_click=_remove_and_notify, args=(bookmark,)
+                    )
             
             # Add separator between bookmarks
             if idx < len(bookmarks) - 1:
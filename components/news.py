@@ -1,37 +1,76 @@
+import sys
 import time
 import streamlit as st
 import time
 from scraper import get_latest_news
 from summarizer import summarize_text
 from components.bookmarks import save_bookmark
+import metrics
+import profiler
+from singleflight import coalesce
+import object_cache
+from object_cache import shared_cache
+from article_store import ArticleStore
+from utils import render_copies, render_related
+import dedup
+import related
 
 # Cache the news fetching for 1 hour
-@st.cache_data(ttl=3600, show_spinner="Fetching articles...")
+@coalesce("techcrunch_articles")
+@shared_cache("techcrunch_articles", ttl=3600, namespace="feeds.techcrunch")
 def fetch_articles():
     try:
-        return get_latest_news()
+        with st.spinner("Fetching articles..."):
+            return get_latest_news()
     except Exception as e:
         st.error(f"Failed to fetch articles: {str(e)}")
         return []
 
-# Cache summaries for 24 hours since they don't change
-@st.cache_data(ttl=86400)
+# The indexed store is shared across sessions as-is (no copy per rerun)
+@shared_cache("article_store", ttl=3600, namespace="feeds.techcrunch")
+def load_article_store():
+    store = ArticleStore.from_dicts(fetch_articles())
+    index = dedup.get_index()
+    for a in store.articles:
+        index.add(a.url, title=a.title, text=a.content, url=a.url, source="techcrunch")
+    related.add_many(
+        {"url": a.url, "title": a.title, "text": a.content, "source": "techcrunch"}
+        for a in store.articles
+    )
+    return store
+
+# Each filter result is its own cache entry. It only holds references to
+# the store's articles, so it is accounted at the size of the list itself.
+def filter_articles(store, category, topic):
+    cache = object_cache.get_cache()
+    key = ("feeds.techcrunch", "article_filter", (store.generation, category, topic))
+    hit, articles = cache.get(key)
+    metrics.record_cache("article_filter", hit)
+    if not hit:
+        articles = tuple(store.filter(category, topic))
+        cache.put(key, articles, ttl=3600, size=sys.getsizeof(articles))
+    return articles
+
+# summarize_text caches successful summaries for 24 hours; failures
+# (e.g. requests shed by the LLM scheduler) are not cached so they can retry
 def get_cached_summary(content):
     try:
         return summarize_text(content)
     except Exception as e:
         return f"Could not summarize: {str(e)}"
 
+@profiler.profiled("render_news_tab")
+@metrics.timed("render.news")
 def render_news_tab():
     """Render the latest news tab."""
     st.title("📰 Tech News Hub")
     
     # Fetch Articles
-    articles = fetch_articles()
+    store = load_article_store()
 
-    # Extract Filters
-    categories = sorted({a["category"] for a in articles if a["category"] != "Unknown"})
-    all_topics = sorted({topic for a in articles for topic in a["topics"] if topic != "topic not available"})
+    # Filter facets are precomputed by the store
+    categories = store.categories
+    all_topics = store.topics
 
     # Initialize session state for filters
     if "category_filter" not in st.session_state:
@@ -55,14 +94,7 @@ def render_news_tab():
     )
 
     # Filter Articles
-    def article_matches_filters(article):
-        if selected_category != "All" and article["category"] != selected_category:
-            return False
-        if selected_topic != "All" and selected_topic not in article["topics"]:
-            return False
-        return True
-
-    filtered_articles = [a for a in articles if article_matches_filters(a)]
+    filtered_articles = filter_articles(store, selected_category, selected_topic)
 
     # Show Articles
     st.markdown(f"### Showing {len(filtered_articles)} article(s)")
@@ -71,23 +103,34 @@ def render_news_tab():
         st.warning("No articles match your filters.")
 
     for a in filtered_articles[:len(filtered_articles)]:
-        st.markdown("---")  
-        st.markdown(f"## 🎯 {a['title']}")
-        st.markdown(f"**Date:** {a['date']}  |  **Author:** {a['author']}  |  **Category:** {a['category']}")
-        st.markdown(f"[Read on TechCrunch]({a['url']})")
-        st.markdown("...")
-        try:
-            # Use cached summary
-            summary = get_cached_summary(a['content'])
-            st.markdown(f"{summary}")
-        except Exception as e:
-            st.warning(f"Could not summarize article: {str(e)}")
-        st.markdown(f"**Topics:** {', '.join(a['topics'])}")
-        
-        # Add bookmark button
-        if st.button("🔖 Bookmark", key=f"bookmark_{a['title']}"):
-            save_bookmark(a)
-            st.success("Article bookmarked!")
-        
-        with st.spinner("Loading.."):
-            time.sleep(0.9) 
\ No newline at end of file
+        render_article_card(a)
+
+# Each card is its own fragment: bookmarking reruns the card, not the tab.
+# A card rerun counts as a run of the News tab for the profiler.
+@st.fragment
+@profiler.profiled("render_news_tab")
+@metrics.timed("render.news_card")
+def render_article_card(a):
+    """Render one article with its summary and bookmark button."""
+    st.markdown("---")  
+    st.markdown(f"## 🎯 {a.title}")
+    st.markdown(f"**Date:** {a.date}  |  **Author:** {a.author}  |  **Category:** {a.category}")
+    st.markdown(f"[Read on TechCrunch]({a.url})")
+    render_copies(a.url)
+    render_related(a.url, a.title, a.content)
+    st.markdown("...")
+    try:
+        # Use cached summary
+        summary = get_cached_summary(a.content)
+        st.markdown(f"{summary}")
+    except Exception as e:
+        st.warning(f"Could not summarize article: {str(e)}")
+    st.markdown(f"**Topics:** {', '.join(a.topics)}")
+    
+    # Add bookmark button
+    if st.button("🔖 Bookmark", key=f"bookmark_{a.title}"):
+        save_bookmark(a.to_dict())
+        st.success("Article bookmarked!")
+    
+    with st.spinner("Loading.."):
+        time.sleep(0.9) 
\ No newline at end of file
@@ -0,0 +1,159 @@
+import os
+import streamlit as st
+import metrics
+import llm_scheduler
+import object_cache
+import http_cache
+import arxiv_cache
+import related
+import profiler
+from config import Config
+
+def render_performance_panel(profile_targets=()):
+    """Admin-only sidebar panel with stage latencies, cache hit rates and errors.
+    profile_targets are the tab render functions the profiler can capture."""
+    with st.expander("📈 Performance", expanded=False):
+        snap = metrics.snapshot()
+
+        if snap["stages"]:
+            st.markdown("**Stages** (seconds)")
+            st.dataframe(
+                [
+                    {
+                        "stage": stage,
+                        "calls": s["count"],
+                        "errors": s["errors"],
+                        "p50": round(s["p50"], 3),
+                        "p95": round(s["p95"], 3),
+                        "max": round(s["max"], 3),
+                    }
+                    for stage, s in snap["stages"].items()
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+        else:
+            st.caption("No timings recorded yet.")
+
+        if snap["caches"]:
+            st.markdown("**Caches**")
+            st.dataframe(
+                [
+                    {
+                        "cache": name,
+                        "hits": c["hits"],
+                        "misses": c["misses"],
+                        "hit rate": f"{c['hit_rate']:.0%}",
+                    }
+                    for name, c in snap["caches"].items()
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        cache_stats = object_cache.get_cache().stats()
+        st.markdown("**Shared object cache**")
+        st.caption(
+            f"{cache_stats['bytes'] / 2**20:.1f} / {cache_stats['max_bytes'] / 2**20:.0f} MB in "
+            f"{cache_stats['entries']} entries, {cache_stats['evictions']} evictions"
+        )
+        for namespace, (size, budget) in cache_stats["reserved"].items():
+            st.caption(f"Reserved for {namespace}: {size / 2**20:.1f} / {budget / 2**20:.0f} MB")
+        for name, (count, size) in sorted(cache_stats["by_name"].items()):
+            st.caption(f"• {name}: {count} entries, {size / 2**20:.2f} MB")
+        if cache_stats["namespaces"]:
+            namespace = st.selectbox("Namespace", cache_stats["namespaces"], key="perf_cache_namespace")
+            if st.button("🧹 Invalidate namespace", use_container_width=True):
+                object_cache.invalidate(namespace)
+                st.rerun()
+
+        disk = http_cache.get_cache().stats()
+        st.caption(
+            f"HTTP disk cache: {disk['bytes'] / 2**20:.1f} / {disk['max_bytes'] / 2**20:.0f} MB "
+            f"compressed, {disk['entries']} responses"
+        )
+        searches = arxiv_cache.get_cache().stats()
+        st.caption(f"arXiv search cache: {searches['searches']} searches, {searches['results']} results")
+        index = related.get_index().stats()
+        st.caption(f"Related-items index: {index['entries']} items, {index['bytes'] / 2**20:.1f} MB on disk")
+
+        status = llm_scheduler.get_scheduler().status()
+        st.markdown("**LLM scheduler**")
+        queued = ", ".join(f"{lane} {n}" for lane, n in status["queued"].items())
+        st.caption(
+            f"Queued: {queued} | rate {status['rate_factor']:.0%} of quota"
+            + (f" | backing off {status['paused_for']:.0f}s" if status["paused_for"] else "")
+        )
+
+        _render_profiler(list(profile_targets) + list(profiler.JOB_TARGETS))
+
+        if snap["counters"]:
+            st.markdown("**Counters**")
+            for name, value in snap["counters"].items():
+                st.caption(f"{name}: {value:g}")
+
+        prometheus_text = metrics.render_prometheus()
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "⬇️ Prometheus",
+                prometheus_text,
+                file_name="metrics.prom",
+                mime="text/plain",
+                use_container_width=True,
+            )
+        with col2:
+            if st.button("💾 Write file", use_container_width=True):
+                metrics.write_prometheus(Config.METRICS_FILE)
+                st.success(f"Wrote {Config.METRICS_FILE}")
+        if st.button("♻️ Reset metrics", use_container_width=True):
+            metrics.reset()
+            st.rerun()
+        if Config.METRICS_PORT:
+            st.caption(f"Scrape endpoint: :{Config.METRICS_PORT}/metrics")
+
+
+# Callbacks run before the rerun, so an armed tab is captured on that rerun
+def _arm_selected():
+    profiler.arm(st.session_state.perf_profile_target)
+
+
+def _disarm_selected():
+    profiler.disarm(st.session_state.perf_profile_target)
+
+
+def _render_profiler(targets):
+    st.markdown("**Profiler**")
+    st.selectbox("Target", targets, key="perf_profile_target")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("🔬 Profile next run", on_click=_arm_selected, use_container_width=True)
+    with col2:
+        st.button("✖️ Disarm", on_click=_disarm_selected, use_container_width=True)
+    armed = profiler.armed()
+    if armed:
+        st.caption("Armed: " + ", ".join(armed) + (" (runs with the next digest)" if "pipeline" in armed else ""))
+
+    captures = profiler.captures()
+    if not captures:
+        st.caption("No captures yet.")
+        return
+    path = st.selectbox("Capture", captures, format_func=os.path.basename, key="perf_profile_capture")
+    summary = profiler.load_summary(path)
+    st.caption(
+        f"{summary['target']} at {summary['started_at']}: {summary['seconds']:.2f}s, "
+        f"{summary['threads']} thread(s), peak {summary['peak_mib']:.1f} MiB traced"
+    )
+    st.dataframe(summary["hotspots"], hide_index=True, use_container_width=True)
+    st.dataframe(summary["allocations"], hide_index=True, use_container_width=True)
+    col1, col2 = st.columns(2)
+    for col, ext, label in ((col1, ".prof", "⬇️ cProfile"), (col2, ".tracemalloc", "⬇️ Allocations")):
+        if os.path.exists(path + ext):
+            with col, open(path + ext, "rb") as f:
+                st.download_button(
+                    label,
+                    f.read(),
+                    file_name=os.path.basename(path + ext),
+                    mime="application/octet-stream",
+                    use_container_width=True,
+                )
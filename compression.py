@@ -0,0 +1,117 @@
+import logging
+import re
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+")
+_HEADER_PREFIXES = ("Title:", "URL:", "Source:")
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English)."""
+    return (len(text) + 3) // 4
+
+
+def budget_for_length(length):
+    """Context token budget for a report of `length` words."""
+    budget = int(length) * Config.CONTEXT_TOKENS_PER_WORD
+    return max(Config.CONTEXT_MIN_TOKENS, min(budget, Config.CONTEXT_MAX_TOKENS))
+
+
+def _words(text):
+    return [w for w in _WORD.findall(text.lower()) if len(w) > 2]
+
+
+def _parse_blocks(raw_news):
+    """Split search output into blocks of header lines and body sentences."""
+    blocks = []
+    for chunk in re.split(r"\n\s*\n", raw_news.strip()):
+        headers = []
+        body = []
+        for line in chunk.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(_HEADER_PREFIXES):
+                headers.append(line)
+            else:
+                if line.startswith("Summary:"):
+                    line = line[len("Summary:"):].strip()
+                body.append(line)
+        sentences = [s.strip() for s in _SENTENCE_SPLIT.split(" ".join(body)) if s.strip()]
+        blocks.append({"headers": headers, "sentences": sentences})
+    return blocks
+
+
+def _is_duplicate(words, seen):
+    """A sentence is a duplicate when most of its words already appeared
+    together in an earlier sentence."""
+    word_set = set(words)
+    if not word_set:
+        return True
+    for other in seen:
+        overlap = len(word_set & other) / min(len(word_set), len(other))
+        if overlap >= 0.8:
+            return True
+    return False
+
+
+def compress_context(raw_news, topic, length):
+    """Deduplicate, rank and trim raw search output to the token budget
+    for the requested report length."""
+    if not raw_news:
+        return raw_news
+
+    budget = budget_for_length(length)
+    original_tokens = estimate_tokens(raw_news)
+    if original_tokens <= budget:
+        logger.info("Context for %r fits the budget (%d/%d tokens)", topic, original_tokens, budget)
+        return raw_news
+
+    topic_words = set(_words(topic))
+    blocks = _parse_blocks(raw_news)
+
+    # Score every unique sentence; earlier sentences of a block tend to be
+    # the lede, so they get a small boost.
+    candidates = []
+    seen = []
+    for block_idx, block in enumerate(blocks):
+        for sent_idx, sentence in enumerate(block["sentences"]):
+            words = _words(sentence)
+            if _is_duplicate(words, seen):
+                continue
+            seen.append(set(words))
+            hits = sum(1 for w in words if w in topic_words)
+            score = hits / (len(words) ** 0.5) + 1.0 / (sent_idx + 1)
+            candidates.append((score, block_idx, sent_idx, sentence))
+
+    candidates.sort(key=lambda c: c[0], reverse=True)
+
+    selected = {}
+    used = 0
+    for score, block_idx, sent_idx, sentence in candidates:
+        cost = estimate_tokens(sentence) + 1
+        if block_idx not in selected:
+            cost += sum(estimate_tokens(h) + 1 for h in blocks[block_idx]["headers"])
+        if used + cost > budget:
+            continue
+        selected.setdefault(block_idx, []).append((sent_idx, sentence))
+        used += cost
+
+    # Re-assemble in source order so the model still sees coherent snippets.
+    parts = []
+    for block_idx in sorted(selected):
+        sentences = " ".join(s for _, s in sorted(selected[block_idx]))
+        lines = blocks[block_idx]["headers"] + [f"Summary: {sentences}"]
+        parts.append("\n".join(lines))
+    compressed = "\n\n".join(parts)
+
+    compressed_tokens = estimate_tokens(compressed)
+    logger.info(
+        "Compressed context for %r: %d -> %d tokens (%d saved, budget %d)",
+        topic, original_tokens, compressed_tokens, original_tokens - compressed_tokens, budget,
+    )
+    return compressed
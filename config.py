@@ -21,4 +21,77 @@ class Config:
     
     # Logging
     LOG_LEVEL = 'INFO'
-    LOG_FILE = 'app.log' 
\ No newline at end of file
+    LOG_FILE = 'app.log'
+    
+    # Admin / metrics
+    ADMIN_MODE = os.environ.get('ADMIN_MODE', '').lower() in ('1', 'true', 'yes')
+    METRICS_FILE = os.environ.get('METRICS_FILE', 'metrics.prom')
+    METRICS_PORT = int(os.environ.get('METRICS_PORT', 0))  # 0 disables the /metrics endpoint
+    
+    # On-demand profiler captures (see profiler.py)
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'profiles'))
+    PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', 25))  # hotspots and allocation sites kept in the summary
+    PROFILE_TRACE_FRAMES = int(os.environ.get('PROFILE_TRACE_FRAMES', 1))  # tracemalloc traceback depth; more is slower
+    PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 20))  # older captures are deleted
+    
+    # Prompt context budget (tokens of source material per requested word)
+    CONTEXT_TOKENS_PER_WORD = int(os.environ.get('CONTEXT_TOKENS_PER_WORD', 4))
+    CONTEXT_MIN_TOKENS = int(os.environ.get('CONTEXT_MIN_TOKENS', 600))
+    CONTEXT_MAX_TOKENS = int(os.environ.get('CONTEXT_MAX_TOKENS', 4000))
+    
+    # Gemini quota and scheduler lanes
+    LLM_REQUESTS_PER_MINUTE = float(os.environ.get('LLM_REQUESTS_PER_MINUTE', 15))
+    LLM_TOKENS_PER_MINUTE = float(os.environ.get('LLM_TOKENS_PER_MINUTE', 1000000))
+    LLM_BURST = int(os.environ.get('LLM_BURST', 5))
+    LLM_MAX_WAIT_INTERACTIVE = float(os.environ.get('LLM_MAX_WAIT_INTERACTIVE', 120))
+    LLM_MAX_WAIT_VISIBLE = float(os.environ.get('LLM_MAX_WAIT_VISIBLE', 60))
+    LLM_MAX_WAIT_BACKGROUND = float(os.environ.get('LLM_MAX_WAIT_BACKGROUND', 30))
+    LLM_SHED_QUEUE_DEPTH = int(os.environ.get('LLM_SHED_QUEUE_DEPTH', 10))  # background work is dropped beyond this
+    
+    # Content triage before summarizing (see triage.py)
+    TRIAGE_MIN_WORDS = int(os.environ.get('TRIAGE_MIN_WORDS', 60))  # shorter texts are shown as-is
+    TRIAGE_MAX_BOILERPLATE = float(os.environ.get('TRIAGE_MAX_BOILERPLATE', 0.5))  # share of short cookie/login/paywall lines
+    TRIAGE_MIN_FUNCTION_WORDS = float(os.environ.get('TRIAGE_MIN_FUNCTION_WORDS', 0.08))
+    
+    # Near-duplicate index (cleared and rebuilt when it grows past this)
+    DEDUP_MAX_DOCS = int(os.environ.get('DEDUP_MAX_DOCS', 5000))
+    
+    # Shared in-process cache for large fetch results
+    OBJECT_CACHE_MAX_BYTES = int(os.environ.get('OBJECT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    OBJECT_CACHE_SUMMARY_BYTES = int(os.environ.get('OBJECT_CACHE_SUMMARY_BYTES', 32 * 1024 * 1024))  # reserved for LLM summaries, out of the total
+    
+    # On-disk HTTP cache for article pages and arXiv API responses
+    HTTP_CACHE_PATH = os.environ.get('HTTP_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'http.sqlite'))
+    HTTP_CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+    
+    # Persistent arXiv search results (answers smaller searches from larger ones)
+    ARXIV_SEARCH_CACHE_PATH = os.environ.get('ARXIV_SEARCH_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'arxiv_search.sqlite'))
+    ARXIV_SEARCH_TTL = float(os.environ.get('ARXIV_SEARCH_TTL', 6 * 3600))
+    ARXIV_SEARCH_MAX_SEARCHES = int(os.environ.get('ARXIV_SEARCH_MAX_SEARCHES', 1000))
+    
+    # Hacker News discussion threads
+    HN_COMMENT_WORKERS = int(os.environ.get('HN_COMMENT_WORKERS', 16))  # shared by all sessions
+    HN_MAX_DEPTH = int(os.environ.get('HN_MAX_DEPTH', 5))
+    HN_MAX_COMMENTS = int(os.environ.get('HN_MAX_COMMENTS', 300))  # item requests per thread
+    HN_THREAD_TIMEOUT = float(os.environ.get('HN_THREAD_TIMEOUT', 8))
+    HN_DISCUSSION_TOKENS = int(os.environ.get('HN_DISCUSSION_TOKENS', 6000))
+    
+    # Related-items vector index (memory-mapped, shared by the app and batch runs)
+    RELATED_INDEX_DIR = os.environ.get('RELATED_INDEX_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'related'))
+    RELATED_CANDIDATES = int(os.environ.get('RELATED_CANDIDATES', 512))  # SimHash shortlist re-ranked by cosine
+    RELATED_MIN_SCORE = float(os.environ.get('RELATED_MIN_SCORE', 0.25))
+    RELATED_RESULTS = int(os.environ.get('RELATED_RESULTS', 5))
+    
+    # TechCrunch backfill crawl
+    CRAWL_ARTICLES_FILE = os.environ.get('CRAWL_ARTICLES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'crawl', 'techcrunch.jsonl'))
+    CRAWL_PER_HOST = int(os.environ.get('CRAWL_PER_HOST', 4))  # concurrent requests per host
+    CRAWL_FRONTIER_SIZE = int(os.environ.get('CRAWL_FRONTIER_SIZE', 200))  # queued article URLs
+    
+    # arXiv PDF ingestion (extracted text is cached on disk by paper id)
+    PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pdfs'))
+    PDF_WORKERS = int(os.environ.get('PDF_WORKERS', 2))
+    PDF_MAX_BYTES = int(os.environ.get('PDF_MAX_BYTES', 50 * 1024 * 1024))
+    PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 60))
+    PDF_EXTRACT_TIMEOUT = float(os.environ.get('PDF_EXTRACT_TIMEOUT', 120))
+    PDF_CHUNK_TOKENS = int(os.environ.get('PDF_CHUNK_TOKENS', 8000))
+    PDF_MAX_CHUNKS = int(os.environ.get('PDF_MAX_CHUNKS', 6))  # bounds Gemini calls per paper
@@ -0,0 +1,310 @@
+"""
+Backfill crawl of TechCrunch's paginated listing.
+
+A single walker follows the listing's "Next" links and feeds article URLs
+into a bounded frontier queue; worker threads drain it and fetch articles,
+never more than CRAWL_PER_HOST at once per host. The walk stops at a date
+cutoff (or page limit). Fetched articles are appended to a JSONL file and
+the crawl position is checkpointed, so an interrupted crawl resumes where
+it left off:
+
+    python crawler.py --since 2025-06-01
+    python crawler.py --since 30d --workers 8 --per-host 4   # rerun to resume
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import requests
+
+import dedup
+import metrics
+import related
+import scraper
+from article_store import ArticleStore
+from config import Config
+
+logger = logging.getLogger("crawler")
+
+_DONE = object()
+
+
+def parse_cutoff(value):
+    """'2025-06-01' or '30d' -> aware datetime."""
+    match = re.fullmatch(r"(\d+)d", value.strip())
+    if match:
+        return datetime.now(timezone.utc) - timedelta(days=int(match.group(1)))
+    cutoff = datetime.fromisoformat(value)
+    return cutoff if cutoff.tzinfo else cutoff.replace(tzinfo=timezone.utc)
+
+
+def _published(card):
+    try:
+        return datetime.fromisoformat(card["published"])
+    except (TypeError, ValueError):
+        return None
+
+
+def load_articles(path=None):
+    """Articles written by previous crawls, oldest lines first."""
+    path = path or Config.CRAWL_ARTICLES_FILE
+    articles = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    articles.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted crawl
+    return articles
+
+
+def load_store(path=None):
+    """ArticleStore over the crawled articles, one per URL, newest first."""
+    by_url = {}
+    for article in load_articles(path):
+        by_url[dedup.normalize_url(article["url"])] = article
+    articles = sorted(by_url.values(), key=lambda a: a.get("published") or "", reverse=True)
+    return ArticleStore.from_dicts(articles)
+
+
+class HostLimiter:
+    """Caps concurrent requests per host."""
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._gates = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._gates:
+                self._gates[host] = threading.BoundedSemaphore(self.per_host)
+            return self._gates[host]
+
+
+class Crawler:
+    def __init__(self, articles_path, state_path, cutoff=None, max_pages=None,
+                 workers=8, per_host=4, frontier_size=200):
+        self.articles_path = articles_path
+        self.state_path = state_path
+        self.cutoff = cutoff
+        self.max_pages = max_pages
+        self.workers = workers
+        self.frontier = queue.Queue(maxsize=frontier_size)
+        self.limit = HostLimiter(per_host)
+        self.session = scraper.get_session()
+
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._failed = {}       # url -> listing card, retried on the next run
+        self._pending = {}      # listing page number -> articles not yet finished
+        self._next_urls = {}    # listing page number -> URL of the following page
+        self._watermark = 0     # every page up to this one is fully fetched
+        self._resume_url = None
+        self._incremental = False
+        self.stats = {"pages": 0, "fetched": 0, "failed": 0, "skipped_old": 0, "duplicates": 0}
+
+    # -- checkpoint -----------------------------------------------------
+
+    def _load_state(self):
+        for article in load_articles(self.articles_path):
+            self._seen.add(dedup.normalize_url(article["url"]))
+        state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        self._resume_url = state.get("next_page_url")
+        self._failed = {card["url"]: card for card in state.get("failed", ())}
+        self._seen.update(dedup.normalize_url(url) for url in self._failed)
+        self._watermark = state.get("pages_done", 0)
+        return state
+
+    def _save_state(self, finished=False):
+        state = {
+            "next_page_url": self._next_urls.get(self._watermark, self._resume_url),
+            "pages_done": self._watermark,
+            "failed": list(self._failed.values()),
+            "finished": finished,
+            "cutoff": self.cutoff.isoformat() if self.cutoff else None,
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        partial = self.state_path + ".tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(partial, self.state_path)
+
+    def _finish(self, page, count=1):
+        """Mark `count` articles of a listing page done and advance the
+        watermark past every page whose articles have all been handled."""
+        with self._lock:
+            self._pending[page] -= count
+            advanced = False
+            while self._pending.get(self._watermark + 1) == 0:
+                self._watermark += 1
+                del self._pending[self._watermark]
+                advanced = True
+            if advanced:
+                self._save_state()
+
+    # -- listing walker ---------------------------------------------------
+
+    def _walk(self, start_url, first_page):
+        url, page = start_url, first_page
+        try:
+            while url and (not self.max_pages or page < first_page + self.max_pages):
+                page += 1
+                try:
+                    with self.limit(url):
+                        with metrics.timed("fetch.techcrunch_listing"):
+                            response = self.session.get(url, headers=scraper.HEADERS, timeout=15)
+                            response.raise_for_status()
+                except requests.RequestException as e:
+                    # The checkpoint still points at this page; rerun to resume
+                    logger.error("listing page %d failed: %s", page, e)
+                    break
+                cards, next_url = scraper.parse_listing_page(response.content)
+                self.stats["pages"] += 1
+
+                fresh = []
+                all_old = bool(cards)
+                for card in cards:
+                    published = _published(card)
+                    if self.cutoff and published and published < self.cutoff:
+                        self.stats["skipped_old"] += 1
+                        continue
+                    all_old = False
+                    key = dedup.normalize_url(card["url"])
+                    with self._lock:
+                        if key in self._seen:
+                            self.stats["duplicates"] += 1
+                            continue
+                        self._seen.add(key)
+                    fresh.append(card)
+
+                with self._lock:
+                    self._pending[page] = len(fresh)
+                    self._next_urls[page] = next_url
+                # A finished crawl rerun only needs the pages with new articles
+                caught_up = self._incremental and cards and not fresh
+                if all_old or caught_up:
+                    logger.info("%s on page %d", "reached cutoff" if all_old else "caught up", page)
+                    with self._lock:
+                        self._next_urls[page] = None
+
+                for card in fresh:
+                    self.frontier.put((page, card))  # blocks while the frontier is full
+                if not fresh:
+                    self._finish(page, 0)
+
+                logger.info("page %d: %d new, next=%s", page, len(fresh), bool(next_url))
+                if all_old or caught_up:
+                    break
+                url = next_url
+        finally:
+            for _ in range(self.workers):
+                self.frontier.put(_DONE)
+
+    # -- article workers --------------------------------------------------
+
+    def _work(self, out):
+        while True:
+            item = self.frontier.get()
+            if item is _DONE:
+                return
+            page, card = item
+            with self.limit(card["url"]):
+                article = scraper.fetch_article(card["url"], card["title"], self.session)
+            if article:
+                related.add(article["url"], article["title"], article["content"], "techcrunch")
+            with self._lock:
+                if article:
+                    article["published"] = card.get("published")
+                    out.write(json.dumps(article, ensure_ascii=False) + "\n")
+                    out.flush()
+                    self._failed.pop(card["url"], None)
+                    self.stats["fetched"] += 1
+                else:
+                    self._failed[card["url"]] = card
+                    self.stats["failed"] += 1
+            if page is not None:
+                self._finish(page)
+
+    # -- entry point ------------------------------------------------------
+
+    def run(self, start_url=None, fresh=False):
+        os.makedirs(os.path.dirname(os.path.abspath(self.articles_path)), exist_ok=True)
+        if fresh:
+            for path in (self.articles_path, self.state_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        state = self._load_state()
+        if state.get("finished"):
+            # Start a new pass from the top; it stops at the first page
+            # without new articles
+            self._resume_url, self._watermark = None, 0
+            self._incremental = True
+        start = self._resume_url or start_url or scraper.LATEST_URL
+        logger.info("crawling from %s (%d articles already stored)", start, len(self._seen))
+
+        started = time.perf_counter()
+        with open(self.articles_path, "a", encoding="utf-8") as out:
+            with ThreadPoolExecutor(max_workers=self.workers + 1) as pool:
+                # Articles that failed last time are retried first
+                for card in list(self._failed.values()):
+                    self.frontier.put((None, card))
+                walker = pool.submit(self._walk, start, self._watermark)
+                workers = [pool.submit(self._work, out) for _ in range(self.workers)]
+                walker.result()
+                for worker in workers:
+                    worker.result()
+        self._save_state(finished=self._next_urls.get(self._watermark, self._resume_url) is None)
+        self.stats["seconds"] = time.perf_counter() - started
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--since", help="Date cutoff, e.g. 2025-06-01 or 7d")
+    parser.add_argument("--max-pages", type=int, help="Stop after this many listing pages")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=Config.CRAWL_PER_HOST, help="Concurrent requests per host")
+    parser.add_argument("--frontier", type=int, default=Config.CRAWL_FRONTIER_SIZE, help="Max queued article URLs")
+    parser.add_argument("--out", default=Config.CRAWL_ARTICLES_FILE, help="Articles JSONL")
+    parser.add_argument("--start-url", help="First listing page (default: scraper.LATEST_URL)")
+    parser.add_argument("--fresh", action="store_true", help="Discard the checkpoint and stored articles")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=Config.LOG_LEVEL, format="%(asctime)s %(levelname)s %(message)s")
+    if not args.since and not args.max_pages:
+        parser.error("give --since and/or --max-pages to bound the crawl")
+
+    crawler = Crawler(
+        articles_path=args.out,
+        state_path=args.out + ".state.json",
+        cutoff=parse_cutoff(args.since) if args.since else None,
+        max_pages=args.max_pages,
+        workers=args.workers,
+        per_host=args.per_host,
+        frontier_size=args.frontier,
+    )
+    stats = crawler.run(start_url=args.start_url, fresh=args.fresh)
+    print(
+        f"{stats['pages']} listing pages, {stats['fetched']} articles fetched, {stats['failed']} failed, "
+        f"{stats['duplicates']} duplicates, {stats['skipped_old']} older than cutoff in {stats['seconds']:.1f}s "
+        f"({stats['fetched'] / stats['seconds'] if stats['seconds'] else 0:.1f} articles/s)"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Cross-source near-duplicate detection with MinHash signatures and an LSH
+index.
+
+The same story often arrives as a TechCrunch article, a Hacker News link
+and a few search results. Each document is indexed by up to three signals:
+its normalized URL, a MinHash of its title words and a MinHash of its body
+shingles. Documents that share a URL or whose signatures collide in an LSH
+band (and pass a Jaccard check) are merged into one cluster, so the
+cluster can be summarized once and the copies linked together in the UI.
+"""
+import hashlib
+import random
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from config import Config
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands of 4 rows: ~50% Jaccard has a ~65% chance to collide
+ROWS = NUM_PERM // BANDS
+TITLE_THRESHOLD = 0.6
+CONTENT_THRESHOLD = 0.5
+MIN_CONTENT_WORDS = 30
+MAX_CONTENT_WORDS = 400
+SIGNATURE_MEMO_SIZE = 2048  # canonical_text signatures kept by text digest
+
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def normalize_url(url):
+    parts = urlsplit(url or "")
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if not host:
+        return ""
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def title_features(title):
+    """Words and word pairs of a title; short texts need both to compare well."""
+    words = _WORD.findall((title or "").lower())
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def content_features(text):
+    """Word 3-gram shingles over the start of the body."""
+    words = _WORD.findall((text or "").lower())[:MAX_CONTENT_WORDS]
+    if len(words) < MIN_CONTENT_WORDS:
+        return set()
+    return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def minhash(features):
+    hashes = [_hash64(f) for f in features]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_jaccard(sig_a, sig_b):
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """Thread-safe LSH index that clusters near-duplicate documents.
+
+    Documents are identified by a caller-chosen id (a URL works well) and
+    may carry arbitrary metadata (source, title, url) for display.
+    """
+
+    def __init__(self, max_docs=None):
+        self.max_docs = max_docs or Config.DEDUP_MAX_DOCS
+        self._lock = threading.Lock()
+        self._signature_memo = OrderedDict()  # not part of the index; survives clear()
+        self.clear()
+
+    def clear(self):
+        self._parent = {}
+        self._order = {}
+        self._clusters = {}     # root -> [doc_id, ...] in insertion order
+        self._meta = {}
+        self._texts = {}        # doc_id -> body, for documents with a content signature
+        self._signatures = {}   # (kind, doc_id) -> signature
+        self._buckets = {}      # (kind, band, band values) -> [doc_id, ...]
+        self._urls = {}         # normalized url -> doc_id
+
+    def __len__(self):
+        return len(self._parent)
+
+    # -- union-find, oldest document wins as the cluster root -----------
+
+    def _find(self, doc_id):
+        root = doc_id
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[doc_id] != root:
+            self._parent[doc_id], doc_id = root, self._parent[doc_id]
+        return root
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return
+        if self._order[root_b] < self._order[root_a]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        merged = self._clusters.pop(root_b)
+        self._clusters[root_a] = sorted(self._clusters[root_a] + merged, key=self._order.get)
+
+    # -- indexing --------------------------------------------------------
+
+    def _index_signature(self, kind, doc_id, signature, threshold):
+        self._signatures[(kind, doc_id)] = signature
+        for band in range(BANDS):
+            key = (kind, band, signature[band * ROWS:(band + 1) * ROWS])
+            bucket = self._buckets.setdefault(key, [])
+            for other in bucket:
+                if self._find(other) == self._find(doc_id):
+                    continue
+                if estimated_jaccard(signature, self._signatures[(kind, other)]) >= threshold:
+                    self._union(other, doc_id)
+            bucket.append(doc_id)
+
+    def add(self, doc_id, title="", text="", url="", **meta):
+        """Index a document and return its cluster id."""
+        # Signatures are computed outside the lock; they are the slow part.
+        title_sig = minhash(title_features(title)) if title else None
+        content = content_features(text)
+        content_sig = minhash(content) if content else None
+
+        with self._lock:
+            if doc_id in self._parent:
+                # Known document; only a body that was missing before (e.g.
+                # an HN link whose article has since been fetched) is new.
+                if content_sig and ("content", doc_id) not in self._signatures:
+                    self._texts[doc_id] = text
+                    self._index_signature("content", doc_id, content_sig, CONTENT_THRESHOLD)
+                return self._find(doc_id)
+            if len(self._parent) >= self.max_docs:
+                self.clear()
+
+            self._parent[doc_id] = doc_id
+            self._order[doc_id] = len(self._order)
+            self._clusters[doc_id] = [doc_id]
+            self._meta[doc_id] = {"title": title, "url": url, **meta}
+            if content_sig:
+                self._texts[doc_id] = text
+
+            url_key = normalize_url(url)
+            if url_key:
+                if url_key in self._urls:
+                    self._union(self._urls[url_key], doc_id)
+                else:
+                    self._urls[url_key] = doc_id
+            if title_sig and len(title_features(title)) >= 4:
+                self._index_signature("title", doc_id, title_sig, TITLE_THRESHOLD)
+            if content_sig:
+                self._index_signature("content", doc_id, content_sig, CONTENT_THRESHOLD)
+            return self._find(doc_id)
+
+    def cluster_id(self, doc_id):
+        with self._lock:
+            return self._find(doc_id) if doc_id in self._parent else None
+
+    def members(self, doc_id):
+        """Metadata for every document in doc_id's cluster, oldest first."""
+        with self._lock:
+            if doc_id not in self._parent:
+                return []
+            ids = self._clusters[self._find(doc_id)]
+            return [{"id": d, **self._meta[d]} for d in ids]
+
+    def copies(self, doc_id):
+        """Other linkable documents in doc_id's cluster."""
+        return [
+            m for m in self.members(doc_id)
+            if m["id"] != doc_id and m.get("url")
+        ]
+
+    def _content_matches(self, signature):
+        """Indexed documents whose body signature is a near-duplicate of
+        `signature`; cluster links through titles, URLs or chains don't count."""
+        matches = set()
+        for band in range(BANDS):
+            for other in self._buckets.get(("content", band, signature[band * ROWS:(band + 1) * ROWS]), ()):
+                if other not in matches and (
+                    estimated_jaccard(signature, self._signatures[("content", other)]) >= CONTENT_THRESHOLD
+                ):
+                    matches.add(other)
+        return matches
+
+    def _text_signature(self, text):
+        """Content signature of a text, memoized by digest so card reruns
+        don't recompute the MinHash. None for texts too short to compare."""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            if digest in self._signature_memo:
+                self._signature_memo.move_to_end(digest)
+                return self._signature_memo[digest]
+        features = content_features(text)
+        signature = minhash(features) if features else None
+        with self._lock:
+            self._signature_memo[digest] = signature
+            while len(self._signature_memo) > SIGNATURE_MEMO_SIZE:
+                self._signature_memo.popitem(last=False)
+        return signature
+
+    def canonical_text(self, text):
+        """Return the longest body among `text` and its indexed direct
+        near-duplicates (the oldest on ties), so copies of a story share one
+        summary cache entry and the fullest version is summarized. A
+        read-only lookup: the text itself is not indexed."""
+        signature = self._text_signature(text or "")
+        if signature is None:
+            return text
+        with self._lock:
+            best = None
+            for other in sorted(self._content_matches(signature), key=self._order.get):
+                candidate = self._texts.get(other)
+                if candidate and (best is None or len(candidate) > len(best)):
+                    best = candidate
+        return best if best and len(best) >= len(text) else text
+
+
+_index = NearDuplicateIndex()
+
+
+def get_index():
+    return _index
@@ -0,0 +1,152 @@
+"""
+Hacker News discussion fetcher built on the official Firebase API.
+
+A thread is walked breadth-first: every comment at one depth is fetched
+concurrently on a shared, bounded pool before moving to the next depth.
+Depth, comment-count and wall-clock budgets cap the work per thread, so a
+2,000-comment thread costs at most HN_MAX_COMMENTS requests. Items are
+cached by id in the shared object cache.
+"""
+import html
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from compression import estimate_tokens
+from config import Config
+from object_cache import shared_cache
+from singleflight import coalesce
+
+HN_API_URL = "https://hacker-news.firebaseio.com/v0/"
+
+_executor = ThreadPoolExecutor(max_workers=Config.HN_COMMENT_WORKERS, thread_name_prefix="hn-comments")
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_maxsize=Config.HN_COMMENT_WORKERS))
+_session.mount("http://", HTTPAdapter(pool_maxsize=Config.HN_COMMENT_WORKERS))
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+@coalesce("hn_item")
+@shared_cache("hn_item", ttl=600, namespace="comments")
+def fetch_item(item_id):
+    """One story or comment from the API (None for missing items)."""
+    with metrics.timed("fetch.hn_item"):
+        response = _session.get(f"{HN_API_URL}item/{item_id}.json", timeout=5)
+        response.raise_for_status()
+    return response.json()
+
+
+def comment_text(raw):
+    """Plain text of a comment's HTML body."""
+    text = (raw or "").replace("<p>", "\n")
+    return html.unescape(_TAG.sub("", text)).strip()
+
+
+def fetch_thread(story_id, max_depth=None, max_comments=None, timeout=None):
+    """Fetch a story and its comment tree within the configured budgets.
+
+    Returns {"story", "comments", "loaded", "total", "truncated"} where
+    comments are in reading order (each reply after its parent) and carry
+    their depth; None if the story doesn't exist.
+    """
+    max_depth = max_depth or Config.HN_MAX_DEPTH
+    max_comments = max_comments or Config.HN_MAX_COMMENTS
+    deadline = time.monotonic() + (timeout or Config.HN_THREAD_TIMEOUT)
+
+    story = fetch_item(story_id)
+    if not story:
+        return None
+
+    fetched = []
+    requested = 0
+    truncated = False
+    level = [(kid, story_id) for kid in story.get("kids", ())]
+    depth = 1
+    with metrics.timed("fetch.hn_thread"):
+        while level:
+            if depth > max_depth or requested >= max_comments:
+                truncated = True
+                break
+            if len(level) > max_comments - requested:
+                level = level[:max_comments - requested]
+                truncated = True
+            requested += len(level)
+
+            futures = [(parent, _executor.submit(fetch_item, kid)) for kid, parent in level]
+            next_level = []
+            for parent, future in futures:
+                try:
+                    item = future.result(timeout=max(0, deadline - time.monotonic()))
+                except TimeoutError:
+                    future.cancel()
+                    truncated = True
+                    continue
+                except Exception:
+                    metrics.record_error("fetch.hn_item")
+                    continue
+                if not item or item.get("deleted") or item.get("dead"):
+                    continue
+                fetched.append({
+                    "id": item["id"],
+                    "rank": len(fetched),  # breadth-first position
+                    "parent": parent,
+                    "by": item.get("by", "[unknown]"),
+                    "text": comment_text(item.get("text")),
+                    "depth": depth,
+                })
+                next_level.extend((kid, item["id"]) for kid in item.get("kids", ()))
+            if time.monotonic() >= deadline:
+                truncated = truncated or bool(next_level)
+                break
+            level = next_level
+            depth += 1
+
+    metrics.increment("hn_comments_fetched_total", len(fetched))
+    return {
+        "story": story,
+        "comments": _reading_order(story_id, fetched),
+        "loaded": len(fetched),
+        "total": story.get("descendants", len(fetched)),
+        "truncated": truncated,
+    }
+
+
+def _reading_order(story_id, comments):
+    """Depth-first order from breadth-first fetch results."""
+    children = {}
+    for comment in comments:
+        children.setdefault(comment["parent"], []).append(comment)
+    ordered = []
+    stack = list(reversed(children.get(story_id, [])))
+    while stack:
+        comment = stack.pop()
+        ordered.append(comment)
+        stack.extend(reversed(children.get(comment["id"], [])))
+    return ordered
+
+
+def _format_comment(comment):
+    return f"{'  ' * (comment['depth'] - 1)}- {comment['by']}: {' '.join(comment['text'].split())}"
+
+
+def format_thread(thread, max_tokens=None):
+    """Flatten a thread into indented text within a token budget.
+
+    Comments are admitted breadth-first (top-level and higher ranked ones
+    first, so every kept reply keeps its parent) and printed in reading order.
+    """
+    max_tokens = max_tokens or Config.HN_DISCUSSION_TOKENS
+    kept = set()
+    used = 0
+    for comment in sorted(thread["comments"], key=lambda c: c["rank"]):
+        cost = estimate_tokens(_format_comment(comment))
+        if used + cost > max_tokens:
+            break
+        kept.add(comment["id"])
+        used += cost
+    return "\n".join(_format_comment(c) for c in thread["comments"] if c["id"] in kept)
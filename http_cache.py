@@ -0,0 +1,271 @@
+"""
+On-disk HTTP response cache with conditional revalidation.
+
+Responses to GET requests are stored zlib-compressed in a SQLite file, so
+they survive restarts and are shared by the app and batch runs. Freshness
+follows Cache-Control / Expires (or a heuristic based on Last-Modified);
+once an entry is stale it is revalidated with If-None-Match /
+If-Modified-Since, so an unchanged page costs a 304 instead of a full
+download. The cache is capped in bytes and evicts least recently used
+entries.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import metrics
+from config import Config
+
+# Response headers worth keeping with a cached body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Expires", "Date")
+# Upper bound for heuristic freshness (RFC 9111 suggests 10% of the age
+# since Last-Modified)
+MAX_HEURISTIC_SECONDS = 24 * 3600
+
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _age(headers):
+    """Age header in seconds; 0 when missing or malformed (RFC 9111 4.2.3)."""
+    value = (headers.get("Age") or "").split(",")[0].strip()
+    return int(value) if value.isdigit() else 0
+
+
+def freshness_lifetime(headers, now, default_ttl=0):
+    """Seconds a response stays fresh, or None if it must not be stored."""
+    cc = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in cc:
+        return None
+    if "no-cache" in cc:
+        return 0
+    for directive in ("s-maxage", "max-age"):
+        if (cc.get(directive) or "").isdigit():  # valueless directives parse as None
+            return int(cc[directive]) - _age(headers)
+    date = _http_date(headers.get("Date")) or now
+    expires = headers.get("Expires")
+    if expires:
+        expires_at = _http_date(expires)
+        return expires_at - date if expires_at else 0
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified:
+        return min(0.1 * max(0, date - last_modified), MAX_HEURISTIC_SECONDS)
+    return default_ttl
+
+
+class HTTPCache:
+    """SQLite-backed store of compressed responses with LRU eviction."""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._bytes = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY, headers TEXT, body BLOB, size INTEGER,"
+                " expires REAL, etag TEXT, last_modified TEXT, last_access REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+            self._conn = conn
+            self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        return self._conn
+
+    def lookup(self, url):
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT headers, body, expires, etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            db.commit()
+        headers, body, expires, etag, last_modified = row
+        return {
+            "headers": json.loads(headers),
+            "body": body,
+            "expires": expires,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def store(self, url, headers, content, expires):
+        body = zlib.compress(content, 6)
+        if len(body) > self.max_bytes:
+            return
+        kept = {k: headers[k] for k in STORED_HEADERS if k in headers}
+        with self._lock:
+            db = self._db()
+            old = db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(kept), body, len(body), expires,
+                 headers.get("ETag"), headers.get("Last-Modified"), time.time()),
+            )
+            self._bytes += len(body) - (old[0] if old else 0)
+            self._evict(db)
+            db.commit()
+
+    def refresh(self, url, headers, expires):
+        """Record a 304: keep the body, update validators and expiry."""
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT headers FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return
+            kept = json.loads(row[0])
+            kept.update({k: headers[k] for k in STORED_HEADERS if k in headers})
+            db.execute(
+                "UPDATE responses SET headers = ?, expires = ?, etag = ?, last_modified = ?, last_access = ?"
+                " WHERE url = ?",
+                (json.dumps(kept), expires, kept.get("ETag"), kept.get("Last-Modified"), time.time(), url),
+            )
+            db.commit()
+
+    def _evict(self, db):
+        if self._bytes <= self.max_bytes:
+            return
+        victims = []
+        for url, size in db.execute("SELECT url, size FROM responses ORDER BY last_access"):
+            if self._bytes <= self.max_bytes:
+                break
+            victims.append((url,))
+            self._bytes -= size
+        db.executemany("DELETE FROM responses WHERE url = ?", victims)
+        metrics.increment("http_cache_evictions_total", len(victims))
+
+    def expire(self, url_prefix=""):
+        """Mark entries stale so their next use revalidates (cheap if unchanged)."""
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE responses SET expires = 0 WHERE substr(url, 1, ?) = ?", (len(url_prefix), url_prefix)
+            )
+            db.commit()
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM responses")
+            db.commit()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            db = self._db()
+            entries = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"entries": entries, "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HTTPCache(Config.HTTP_CACHE_PATH, Config.HTTP_CACHE_MAX_BYTES)
+        return _cache
+
+
+def _cached_response(url, entry, content=None):
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content if content is not None else zlib.decompress(entry["body"])
+    response.from_cache = True
+    return response
+
+
+def get(url, params=None, headers=None, timeout=10, session=None, default_ttl=0):
+    """GET through the disk cache; returns a requests.Response.
+
+    default_ttl is the freshness used when the server sends no caching
+    headers at all. Explicit Cache-Control / Expires always win. If a
+    revalidation fails on the network, the stale copy is served.
+    """
+    url = requests.Request("GET", url, params=params).prepare().url
+    cache = get_cache()
+    entry = cache.lookup(url)
+    now = time.time()
+
+    if entry and entry["expires"] > now:
+        content = zlib.decompress(entry["body"])
+        metrics.record_cache("http", True)
+        metrics.increment("http_cache_total", outcome="fresh")
+        metrics.increment("http_cache_bytes_saved_total", len(content))
+        return _cached_response(url, entry, content)
+
+    request_headers = dict(headers or {})
+    if entry and entry["etag"]:
+        request_headers["If-None-Match"] = entry["etag"]
+    if entry and entry["last_modified"]:
+        request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = (session or requests).get(url, headers=request_headers, timeout=timeout)
+    except requests.RequestException:
+        if entry:
+            metrics.increment("http_cache_total", outcome="stale_on_error")
+            return _cached_response(url, entry)
+        raise
+
+    if response.status_code == 304 and entry:
+        lifetime = freshness_lifetime(response.headers, now, default_ttl) or 0
+        cache.refresh(url, response.headers, now + lifetime)
+        content = zlib.decompress(entry["body"])
+        metrics.record_cache("http", True)
+        metrics.increment("http_cache_total", outcome="revalidated")
+        metrics.increment("http_cache_bytes_saved_total", len(content))
+        return _cached_response(url, entry, content)
+
+    metrics.record_cache("http", False)
+    metrics.increment("http_cache_total", outcome="miss")
+    if response.status_code == 200:
+        lifetime = freshness_lifetime(response.headers, now, default_ttl)
+        validators = "ETag" in response.headers or "Last-Modified" in response.headers
+        if lifetime is not None and (lifetime > 0 or validators):
+            cache.store(url, response.headers, response.content, now + lifetime)
+    response.from_cache = False
+    return response
+
+
+def expire(url_prefix=""):
+    get_cache().expire(url_prefix)
+
+
+def clear():
+    get_cache().clear()
@@ -2,16 +2,24 @@ import requests
 from bs4 import BeautifulSoup
 import time
 import streamlit as st
-from summarizer import summarize_text
+from summarizer import summarize_text, summarize_discussion
 from urllib.parse import urljoin
+import metrics
+import profiler
+from singleflight import coalesce
+from object_cache import shared_cache
+import http_cache
+from utils import render_copies, render_related
+import dedup
+import related
+import hn_comments
 
-# Cache the Hacker News items fetching
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def fetch_hacker_news_items():
-    base_url = 'https://news.ycombinator.com/'
-    response = requests.get(base_url)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, 'html.parser')
+HN_BASE_URL = 'https://news.ycombinator.com/'
+
+@metrics.timed("parse.hacker_news")
+def parse_hacker_news_items(html, base_url=HN_BASE_URL):
+    """Extract title/link pairs from the Hacker News front page."""
+    soup = BeautifulSoup(html, 'html.parser')
     items = soup.select('.athing')
     
     processed_items = []
@@ -23,23 +31,47 @@ def fetch_hacker_news_items():
             if link.startswith('item?id='):
                 link = urljoin(base_url, link)
             processed_items.append({
+                'id': item.get('id'),
                 'title': title,
                 'link': link
             })
     return processed_items
 
+@metrics.timed("parse.article_paragraphs")
+def extract_paragraphs(html):
+    """Join the text of every <p> on a page."""
+    article_soup = BeautifulSoup(html, 'html.parser')
+    paragraphs = article_soup.find_all('p')
+    return '\n'.join(p.get_text(strip=True) for p in paragraphs)
+
+# Cache the Hacker News items fetching
+@coalesce("hacker_news_items")
+@shared_cache("hacker_news_items", ttl=300, namespace="feeds.hacker_news")  # Cache for 5 minutes
+def fetch_hacker_news_items(_timeout=15):
+    base_url = HN_BASE_URL
+    with metrics.timed("fetch.hacker_news"):
+        response = requests.get(base_url, timeout=_timeout)
+        response.raise_for_status()
+    return parse_hacker_news_items(response.text, base_url)
+
 # Cache article content fetching
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@coalesce("hn_article_content")
+@shared_cache("hn_article_content", ttl=3600, namespace="bodies")  # Cache for 1 hour
 def fetch_article_content(url):
     try:
-        article_resp = requests.get(url, timeout=10)
-        article_resp.raise_for_status()
-        article_soup = BeautifulSoup(article_resp.text, 'html.parser')
-        paragraphs = article_soup.find_all('p')
-        return '\n'.join(p.get_text(strip=True) for p in paragraphs)
+        with metrics.timed("fetch.hn_article"):
+            article_resp = http_cache.get(url, timeout=10)
+            article_resp.raise_for_status()
+        return extract_paragraphs(article_resp.text)
     except Exception as e:
         return None
 
+def _turn_page(step):
+    st.session_state.hacker_news_page += step
+
+@st.fragment
+@profiler.profiled("render_hacker_news_tab")
+@metrics.timed("render.hacker_news")
 def render_hacker_news_tab():
     st.header("Articles")
     
@@ -54,6 +86,13 @@ def render_hacker_news_tab():
     start_idx = st.session_state.hacker_news_page * 10
     end_idx = start_idx + 10
     current_items = items[start_idx:end_idx]
+    index = dedup.get_index()
+    for item in current_items:
+        index.add(item['link'], title=item['title'], url=item['link'], source="hacker_news")
+    related.add_many(
+        {"url": item['link'], "title": item['title'], "source": "hacker_news"}
+        for item in current_items
+    )
     
     # Create a container for the articles
     articles_container = st.container()
@@ -63,32 +102,48 @@ def render_hacker_news_tab():
         for item in current_items:
             with st.expander(f"{start_idx + current_items.index(item) + 1}. {item['title']}", expanded=False):
                 st.markdown(f"[Read full article]({item['link']})")
+                render_copies(item['link'])
+                render_related(item['link'], item['title'])
                 
                 # Add a button to load content
                 if st.button("Load Summary", key=f"load_{item['link']}"):
                     content = fetch_article_content(item['link'])
                     
                     if content:
+                        index.add(item['link'], text=content)
+                        related.add(item['link'], item['title'], content, "hacker_news")
                         with st.spinner('Generating summary...'):
                             summary = summarize_text(content)
                             st.markdown("### Summary")
                             st.write(summary)
                     else:
                         st.warning("No content could be extracted from this article.")
+                
+                if item.get('id') and st.button("Summarize Discussion", key=f"discussion_{item['id']}"):
+                    with st.spinner('Loading comments...'):
+                        thread = hn_comments.fetch_thread(item['id'])
+                    if thread and thread['comments']:
+                        with st.spinner('Generating summary...'):
+                            summary = summarize_discussion(item['title'], hn_comments.format_thread(thread))
+                        st.markdown("### Discussion")
+                        st.caption(
+                            f"Based on {thread['loaded']} of {thread['total']} comments"
+                            + (" (large thread, top comments only)" if thread['truncated'] else "")
+                        )
+                        st.write(summary)
+                    else:
+                        st.info("No comments yet.")
     
     # Navigation buttons in columns
     col1, col2 = st.columns([1, 1])
     
+    # Page changes run as callbacks, before the tab's fragment reruns
     # Add Previous button if not on first page
     with col1:
         if st.session_state.hacker_news_page > 0:
-            if st.button("← Previous 10 Articles"):
-                st.session_state.hacker_news_page -= 1
-                st.rerun()
+            st.button("← Previous 10 Articles", on_click=_turn_page, args=(-1,))
     
     # Add Next button if there are more items
     with col2:
         if end_idx < len(items):
-            if st.button("Next 10 Articles →"):
-                st.session_state.hacker_news_page += 1
-                st.rerun()
+            st.button("Next 10 Articles →", on_click=_turn_page, args=(1,))
@@ -0,0 +1,33 @@
+import os
+import threading
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+MODEL_NAME = "gemini-2.0-flash"
+
+_lock = threading.Lock()
+_llm = None
+
+def get_api_key():
+    """Read the Gemini key from the environment, falling back to st.secrets.
+    Streamlit is imported only when needed so headless runs work without it."""
+    key = os.environ.get("GOOGLE_API_KEY")
+    if key:
+        return key
+    import streamlit as st
+    return st.secrets["GOOGLE_API_KEY"]
+
+def get_llm():
+    """Return the shared chat model, creating the Gemini client on first use."""
+    global _llm
+    with _lock:
+        if _llm is None:
+            _llm = ChatGoogleGenerativeAI(model=MODEL_NAME, google_api_key=get_api_key())
+        return _llm
+
+def set_llm(llm):
+    """Replace the shared chat model (e.g. with a fake one for load tests).
+    Anything with an invoke(prompt) method returning an object with a
+    .content string will do."""
+    global _llm
+    with _lock:
+        _llm = llm
@@ -0,0 +1,194 @@
+"""
+Central scheduler for Gemini calls: a token-bucket rate limit sized to our
+quota, priority lanes, adaptive backoff on 429s and load shedding.
+
+Lanes, highest priority first:
+    INTERACTIVE  TechTalker / Timeline generation a user is waiting on
+    VISIBLE      summaries for cards currently on screen
+    BACKGROUND   prefetch and batch work; shed first under pressure
+"""
+import heapq
+import itertools
+import threading
+import time
+
+import metrics
+from compression import estimate_tokens
+from config import Config
+from llm_client import get_llm
+
+INTERACTIVE = 0
+VISIBLE = 1
+BACKGROUND = 2
+
+LANE_NAMES = {INTERACTIVE: "interactive", VISIBLE: "visible", BACKGROUND: "background"}
+
+
+class LLMOverloaded(Exception):
+    """Raised when a call is shed or waits longer than its lane allows."""
+
+
+def is_rate_limit_error(error):
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return "429" in text or "resourceexhausted" in text or "resource has been exhausted" in text
+
+
+class LLMScheduler:
+    def __init__(self, requests_per_minute, tokens_per_minute, burst, max_wait, shed_queue_depth, max_retries=3):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.burst = burst
+        self.max_wait = max_wait
+        self.shed_queue_depth = shed_queue_depth
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (lane, seq)
+        self._seq = itertools.count()
+        self._request_tokens = float(burst)
+        self._token_tokens = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        # Multiplicative decrease on 429, additive increase on success.
+        self._rate_factor = 1.0
+        self._paused_until = 0.0
+        self._consecutive_429s = 0
+
+    # -- token buckets -------------------------------------------------
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        per_second = self._rate_factor / 60
+        self._request_tokens = min(self.burst, self._request_tokens + elapsed * self.requests_per_minute * per_second)
+        self._token_tokens = min(self.tokens_per_minute, self._token_tokens + elapsed * self.tokens_per_minute * per_second)
+
+    def _seconds_until_ready(self, now, cost):
+        per_second = self._rate_factor / 60
+        waits = [self._paused_until - now]
+        if self._request_tokens < 1:
+            waits.append((1 - self._request_tokens) / (self.requests_per_minute * per_second))
+        if self._token_tokens < cost:
+            waits.append((cost - self._token_tokens) / (self.tokens_per_minute * per_second))
+        return max(max(waits), 0.01)
+
+    def under_pressure(self, now=None):
+        now = now or time.monotonic()
+        return (
+            now < self._paused_until
+            or self._rate_factor < 0.5
+            or len(self._waiting) >= self.shed_queue_depth
+        )
+
+    # -- admission -----------------------------------------------------
+
+    def _shed(self, lane, reason):
+        metrics.increment("llm_shed_total", lane=LANE_NAMES[lane])
+        raise LLMOverloaded(f"LLM busy, {LANE_NAMES[lane]} request dropped ({reason})")
+
+    def acquire(self, lane, cost=0):
+        """Block until this lane may send one request of `cost` tokens."""
+        cost = min(cost, self.tokens_per_minute)
+        ticket = (lane, next(self._seq))
+        started = time.monotonic()
+        deadline = started + self.max_wait[lane]
+
+        with self._cond:
+            if lane == BACKGROUND and self.under_pressure(started):
+                self._shed(lane, "under pressure")
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    ready = now >= self._paused_until and self._request_tokens >= 1 and self._token_tokens >= cost
+                    if self._waiting[0] == ticket and ready:
+                        heapq.heappop(self._waiting)
+                        self._request_tokens -= 1
+                        self._token_tokens -= cost
+                        self._cond.notify_all()
+                        break
+                    if lane == BACKGROUND and now < self._paused_until:
+                        self._shed(lane, "backing off after rate limit")
+                    if now >= deadline:
+                        self._shed(lane, f"waited {now - started:.0f}s")
+                    self._cond.wait(min(self._seconds_until_ready(now, cost), deadline - now))
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+        metrics.observe(f"llm.queue_wait.{LANE_NAMES[lane]}", time.monotonic() - started)
+
+    def _on_success(self):
+        with self._cond:
+            self._consecutive_429s = 0
+            self._rate_factor = min(1.0, self._rate_factor + 0.05)
+
+    def _on_rate_limited(self):
+        with self._cond:
+            self._consecutive_429s += 1
+            self._rate_factor = max(0.1, self._rate_factor * 0.5)
+            backoff = min(60, 2 ** self._consecutive_429s)
+            self._paused_until = max(self._paused_until, time.monotonic() + backoff)
+            self._cond.notify_all()
+        metrics.increment("llm_rate_limited_total")
+
+    # -- calls ---------------------------------------------------------
+
+    def invoke(self, prompt, lane=VISIBLE):
+        """Send a prompt to the shared model through the scheduler, retrying
+        after backoff when the API answers 429."""
+        cost = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            self.acquire(lane, cost)
+            metrics.increment("llm_calls_total", lane=LANE_NAMES[lane])
+            try:
+                response = get_llm().invoke(prompt)
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    self._on_rate_limited()
+                    if attempt < self.max_retries and lane != BACKGROUND:
+                        continue
+                raise
+            self._on_success()
+            return response
+
+    def status(self):
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                "queued": {name: sum(1 for l, _ in self._waiting if l == lane) for lane, name in LANE_NAMES.items()},
+                "rate_factor": self._rate_factor,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+                "request_tokens": self._request_tokens,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                requests_per_minute=Config.LLM_REQUESTS_PER_MINUTE,
+                tokens_per_minute=Config.LLM_TOKENS_PER_MINUTE,
+                burst=Config.LLM_BURST,
+                max_wait={
+                    INTERACTIVE: Config.LLM_MAX_WAIT_INTERACTIVE,
+                    VISIBLE: Config.LLM_MAX_WAIT_VISIBLE,
+                    BACKGROUND: Config.LLM_MAX_WAIT_BACKGROUND,
+                },
+                shed_queue_depth=Config.LLM_SHED_QUEUE_DEPTH,
+            )
+        return _scheduler
+
+
+def invoke(prompt, lane=VISIBLE):
+    return get_scheduler().invoke(prompt, lane)
@@ -7,6 +7,12 @@ from components.bookmarks import render_bookmarks_tab
 from aiscraper import techtalker_tab, techtimeline_tab
 from ii import render_hacker_news_tab
 from app2 import render_academic_papers_tab
+from components.performance import render_performance_panel
+from config import Config
+from utils import configure_logging
+import metrics
+import object_cache
+import arxiv_cache
 import json
 from datetime import datetime
 
@@ -18,6 +24,9 @@ st.set_page_config(
 )
 
 load_dotenv()
+configure_logging()
+if Config.METRICS_PORT:
+    metrics.start_metrics_server(Config.METRICS_PORT)
 
 # Initialize session state for bookmarks if not exists
 if 'bookmarks' not in st.session_state:
@@ -40,13 +49,29 @@ def save_bookmark(item, item_type="article"):
 def remove_bookmark(index):
     st.session_state.bookmarks.pop(index)
 
+# -------- Tabs --------
+# st.tabs would execute every tab body on each rerun, hidden or not; only
+# the selected tab runs here. Tabs are fragments (the News tab renders each
+# card as one), so their widgets rerun just that part of the page.
+TABS = {
+    "📰 Latest News": render_news_tab,
+    "🔥 Tech Talker": techtalker_tab,
+    "📚 Academic Papers": render_academic_papers_tab,
+    "⌛ Tech Timeline": techtimeline_tab,
+    "💻 Hacker News": render_hacker_news_tab,
+    "🔖 Bookmarks": render_bookmarks_tab,
+}
+
 # Main app content
 with st.sidebar:
     st.title("🚀 Tech Insight")
     
     # Refresh Button
+    # Refetches every source; article bodies and LLM summaries stay cached
     if st.button("🔄 Refresh All", use_container_width=True):
-        st.cache_data.clear()
+        object_cache.invalidate("feeds")
+        object_cache.invalidate("search")
+        arxiv_cache.expire()
         st.rerun()
     
     # About Section in Expander
@@ -72,32 +97,31 @@ with st.sidebar:
         # Version Info
         st.caption("Version 1.0.0 | Made with ❤️")
 
+    if Config.ADMIN_MODE:
+        render_performance_panel([render.__name__ for render in TABS.values()])
+
+# Streamlit drops the state of widgets that weren't rendered in a run, which
+# is every tab but the selected one. Assigning the values back before any tab
+# renders keeps them as plain session state, so inputs and filters survive
+# switching tabs and are picked up again when their tab renders.
+PERSISTENT_WIDGETS = (
+    "category_filter", "topic_filter",                               # News
+    "techtalker_topic_input", "engagement_slider", "length_slider",  # Tech Talker
+    "timeline_topic_input", "timeline_engagement", "timeline_length",  # Tech Timeline
+    "arxiv_query", "arxiv_search_type", "arxiv_max_results",         # Academic Papers
+)
+for key in PERSISTENT_WIDGETS:
+    if key in st.session_state:
+        st.session_state[key] = st.session_state[key]
+
 # Initialize session state for tab selection
 if 'selected_tab' not in st.session_state:
     st.session_state.selected_tab = "📰 Latest News"
 
-# -------- Tabs --------
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-    "📰 Latest News", 
-    "🔥 Tech Talker", 
-    "📚 Academic Papers",
-    "⌛ Tech Timeline",
-    "💻 Hacker News",
-    "🔖 Bookmarks"
-    
-])
+selected_tab = st.radio(
+    "Section", list(TABS), key="selected_tab", horizontal=True, label_visibility="collapsed"
+)
 
 # -------- Render Selected Tab --------
-with tab1:
-    render_news_tab()
-with tab2:
-    techtalker_tab()
-with tab3:
-    render_academic_papers_tab()
-with tab4:
-    techtimeline_tab()
-with tab5:
-    render_hacker_news_tab()
-with tab6:
-    render_bookmarks_tab() 
+TABS[selected_tab]() 
 
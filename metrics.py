@@ -0,0 +1,231 @@
+"""
+Lightweight in-process instrumentation: stage latency histograms, error
+counts and cache hit rates, exportable in Prometheus text format.
+"""
+import functools
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RECENT_SAMPLES = 500
+
+_lock = threading.Lock()
+_latency = {}   # stage -> {"buckets": [...], "sum": float, "count": int, "recent": deque}
+_errors = {}    # stage -> int
+_cache = {}     # cache name -> {"hit": int, "miss": int}
+_counters = {}  # (name, labels tuple) -> float
+_gauges = {}    # (name, labels tuple) -> float
+_server = None
+
+
+def observe(stage, seconds):
+    """Record one latency sample for a stage."""
+    with _lock:
+        entry = _latency.get(stage)
+        if entry is None:
+            entry = {
+                "buckets": [0] * len(LATENCY_BUCKETS),
+                "sum": 0.0,
+                "count": 0,
+                "recent": deque(maxlen=RECENT_SAMPLES),
+            }
+            _latency[stage] = entry
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                entry["buckets"][i] += 1
+        entry["sum"] += seconds
+        entry["count"] += 1
+        entry["recent"].append(seconds)
+
+
+def record_error(stage):
+    with _lock:
+        _errors[stage] = _errors.get(stage, 0) + 1
+
+
+def record_cache(name, hit):
+    with _lock:
+        entry = _cache.setdefault(name, {"hit": 0, "miss": 0})
+        entry["hit" if hit else "miss"] += 1
+
+
+def increment(name, value=1, **labels):
+    """Bump a free-form counter, e.g. increment("llm_calls_total", kind="summary")."""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    """Record the current value of something, e.g. cache bytes in use."""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _gauges[key] = value
+
+
+class timed:
+    """Time a stage, usable as a context manager or a decorator.
+
+    Exceptions are counted as errors for the stage and re-raised.
+    Streamlit's rerun/stop signals derive from BaseException and are not
+    counted.
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.stage, time.perf_counter() - self._start)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            record_error(self.stage)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def _percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def snapshot():
+    """Summarise everything recorded so far, for display."""
+    with _lock:
+        stages = {}
+        for stage in sorted(set(_latency) | set(_errors)):
+            entry = _latency.get(stage)
+            recent = list(entry["recent"]) if entry else []
+            count = entry["count"] if entry else 0
+            stages[stage] = {
+                "count": count,
+                "errors": _errors.get(stage, 0),
+                "mean": entry["sum"] / count if count else 0.0,
+                "p50": _percentile(recent, 0.5),
+                "p95": _percentile(recent, 0.95),
+                "max": max(recent) if recent else 0.0,
+            }
+        caches = {}
+        for name, entry in sorted(_cache.items()):
+            total = entry["hit"] + entry["miss"]
+            caches[name] = {
+                "hits": entry["hit"],
+                "misses": entry["miss"],
+                "hit_rate": entry["hit"] / total if total else 0.0,
+            }
+        counters = {
+            name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else ""): value
+            for (name, labels), value in sorted(_counters.items())
+        }
+        gauges = {
+            name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else ""): value
+            for (name, labels), value in sorted(_gauges.items())
+        }
+    return {"stages": stages, "caches": caches, "counters": counters, "gauges": gauges}
+
+
+def reset():
+    with _lock:
+        _latency.clear()
+        _errors.clear()
+        _cache.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus():
+    """Render all metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        lines.append("# HELP techinsight_stage_latency_seconds Latency of instrumented stages.")
+        lines.append("# TYPE techinsight_stage_latency_seconds histogram")
+        for stage, entry in sorted(_latency.items()):
+            label = f'stage="{_escape(stage)}"'
+            for bound, count in zip(LATENCY_BUCKETS, entry["buckets"]):
+                lines.append(f'techinsight_stage_latency_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'techinsight_stage_latency_seconds_bucket{{{label},le="+Inf"}} {entry["count"]}')
+            lines.append(f"techinsight_stage_latency_seconds_sum{{{label}}} {entry['sum']:.6f}")
+            lines.append(f"techinsight_stage_latency_seconds_count{{{label}}} {entry['count']}")
+
+        lines.append("# HELP techinsight_stage_errors_total Errors raised or reported by instrumented stages.")
+        lines.append("# TYPE techinsight_stage_errors_total counter")
+        for stage, count in sorted(_errors.items()):
+            lines.append(f'techinsight_stage_errors_total{{stage="{_escape(stage)}"}} {count}')
+
+        lines.append("# HELP techinsight_cache_requests_total Cache lookups by result.")
+        lines.append("# TYPE techinsight_cache_requests_total counter")
+        for name, entry in sorted(_cache.items()):
+            for result in ("hit", "miss"):
+                lines.append(
+                    f'techinsight_cache_requests_total{{cache="{_escape(name)}",result="{result}"}} {entry[result]}'
+                )
+
+        typed = set()
+        for (name, labels), value in sorted(_counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE techinsight_{name} counter")
+                typed.add(name)
+            label = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            lines.append(f"techinsight_{name}{{{label}}} {value}" if label else f"techinsight_{name} {value}")
+
+        typed = set()
+        for (name, labels), value in sorted(_gauges.items()):
+            if name not in typed:
+                lines.append(f"# TYPE techinsight_{name} gauge")
+                typed.add(name)
+            label = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            lines.append(f"techinsight_{name}{{{label}}} {value}" if label else f"techinsight_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    """Write the current metrics to a file (for node_exporter's textfile collector)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port):
+    """Serve /metrics on a background thread; safe to call on every rerun."""
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
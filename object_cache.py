@@ -0,0 +1,237 @@
+"""
+Process-wide, byte-bounded LRU cache for large immutable results.
+
+st.cache_data pickles a value when it is stored and unpickles a fresh copy
+on every hit, in every session and on every rerun. For feed lists and
+article bodies that is pure overhead. This cache stores one frozen copy
+per key, hands the same object to every caller, and evicts least recently
+used entries once the accounted size exceeds the byte budget.
+
+Entries live in dotted namespaces ("feeds.techcrunch", "bodies",
+"summaries", ...) so a refresh can drop one source's feed without
+throwing away the LLM summaries every other session depends on.
+
+Summaries are small but cost a Gemini call each, so the "summaries"
+namespace has its own byte budget (OBJECT_CACHE_SUMMARY_BYTES). Churn in
+multi-MB feeds and bodies never evicts them. Keys count toward the budget
+too, and long text arguments are hashed into the key rather than kept.
+"""
+import functools
+import hashlib
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+import metrics
+from config import Config
+
+
+def freeze(value):
+    """Make lists/dicts read-only (tuples/mapping proxies) so a shared
+    cached value cannot be mutated by one session under another."""
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    return value
+
+
+def deep_sizeof(value, _seen=None):
+    """Approximate retained size of a value in bytes, following containers,
+    __dict__ and __slots__ but counting shared objects once."""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(value, (dict, MappingProxyType)):
+        return size + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(v, seen) for v in value)
+    if hasattr(value, "__dict__"):
+        size += deep_sizeof(vars(value), seen)
+    for cls in type(value).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if hasattr(value, slot):
+                size += deep_sizeof(getattr(value, slot), seen)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires")
+
+    def __init__(self, value, size, expires):
+        self.value = value
+        self.size = size
+        self.expires = expires
+
+
+class ObjectCache:
+    """LRU over (namespace, name, args) keys. Top-level namespaces listed in
+    `reserved` get their own byte budget and LRU; everything else shares
+    the rest of max_bytes."""
+
+    def __init__(self, max_bytes, reserved=None):
+        self.max_bytes = max_bytes
+        self.reserved = dict(reserved or {})
+        self._budgets = {name: size for name, size in self.reserved.items()}
+        self._budgets[""] = max(0, max_bytes - sum(self.reserved.values()))
+        self._lock = threading.Lock()
+        self._partitions = {name: OrderedDict() for name in self._budgets}
+        self._sizes = {name: 0 for name in self._budgets}
+        self._bytes = 0
+        self.evictions = 0
+
+    def _partition(self, key):
+        namespace = key[0] if isinstance(key, tuple) and key and isinstance(key[0], str) else ""
+        top = namespace.split(".", 1)[0]
+        return top if top in self.reserved else ""
+
+    def get(self, key):
+        """Return (True, value) on a live hit, else (False, None)."""
+        with self._lock:
+            entries = self._partitions[self._partition(key)]
+            entry = entries.get(key)
+            if entry is None:
+                return False, None
+            if entry.expires is not None and entry.expires < time.monotonic():
+                self._remove(key)
+                return False, None
+            entries.move_to_end(key)
+            return True, entry.value
+
+    def put(self, key, value, ttl=None, size=None):
+        size = (deep_sizeof(value) if size is None else size) + deep_sizeof(key)
+        partition = self._partition(key)
+        budget = self._budgets[partition]
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            entries = self._partitions[partition]
+            if key in entries:
+                self._remove(key)
+            if size > budget:
+                return  # would evict everything else; don't cache it at all
+            entries[key] = _Entry(value, size, expires)
+            self._sizes[partition] += size
+            self._bytes += size
+            while self._sizes[partition] > budget:
+                self._remove(next(iter(entries)))
+                self.evictions += 1
+        metrics.set_gauge("object_cache_bytes", self._bytes)
+
+    def _remove(self, key):
+        partition = self._partition(key)
+        entry = self._partitions[partition].pop(key)
+        self._sizes[partition] -= entry.size
+        self._bytes -= entry.size
+
+    def discard(self, predicate):
+        """Drop every entry whose key matches predicate(key)."""
+        with self._lock:
+            for entries in self._partitions.values():
+                for key in [k for k in entries if predicate(k)]:
+                    self._remove(key)
+        metrics.set_gauge("object_cache_bytes", self._bytes)
+
+    def clear(self):
+        self.discard(lambda key: True)
+
+    def stats(self):
+        with self._lock:
+            by_name = {}
+            namespaces = set()
+            for entries in self._partitions.values():
+                for key, entry in entries.items():
+                    name = key[1]
+                    count, size = by_name.get(name, (0, 0))
+                    by_name[name] = (count + 1, size + entry.size)
+                    namespaces.add(key[0])
+            return {
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "entries": sum(len(entries) for entries in self._partitions.values()),
+                "evictions": self.evictions,
+                "by_name": by_name,
+                "namespaces": sorted(namespaces),
+                "reserved": {
+                    name: (self._sizes[name], budget) for name, budget in self.reserved.items()
+                },
+            }
+
+
+_cache = ObjectCache(
+    Config.OBJECT_CACHE_MAX_BYTES, reserved={"summaries": Config.OBJECT_CACHE_SUMMARY_BYTES}
+)
+
+
+def get_cache():
+    return _cache
+
+
+def clear():
+    _cache.clear()
+
+
+def in_namespace(key_namespace, namespace):
+    """True if key_namespace is namespace or one of its children."""
+    return key_namespace == namespace or key_namespace.startswith(namespace + ".")
+
+
+def invalidate(namespace):
+    """Drop every entry in a namespace and its children, e.g. "feeds"
+    covers "feeds.techcrunch" and "feeds.arxiv"."""
+    _cache.discard(lambda key: in_namespace(key[0], namespace))
+    metrics.increment("object_cache_invalidations_total", namespace=namespace)
+
+
+# Text arguments longer than this are keyed by their digest
+KEY_TEXT_LIMIT = 256
+
+
+def _key_value(value):
+    if isinstance(value, (str, bytes)) and len(value) > KEY_TEXT_LIMIT:
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        return ("blake2b", hashlib.blake2b(data, digest_size=16).hexdigest(), len(value))
+    return value
+
+
+def shared_cache(name, ttl=None, namespace="default"):
+    """Cache a function's frozen result in the process-wide object cache.
+
+    As with st.cache_data, parameters whose name starts with an underscore
+    are left out of the key, and long text arguments are keyed by a digest.
+    None results (the fetchers' failure value) are not cached. The wrapped
+    function gains a .clear() for its own entries; use invalidate() to drop
+    a whole namespace.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            hashed = tuple((k, _key_value(v)) for k, v in bound.arguments.items() if not k.startswith("_"))
+            return (namespace, name, hashed)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            hit, value = _cache.get(key)
+            metrics.record_cache(name, hit)
+            if hit:
+                return value
+            value = freeze(func(*args, **kwargs))
+            if value is not None:
+                _cache.put(key, value, ttl)
+            return value
+
+        wrapper.clear = lambda: _cache.discard(lambda key: key[1] == name)
+        wrapper.namespace = namespace
+        return wrapper
+    return decorator
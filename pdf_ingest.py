@@ -0,0 +1,207 @@
+"""
+Full-text ingestion for arXiv PDFs.
+
+PDFs are streamed to disk, then parsed in a process pool so that CPU-heavy
+text extraction never holds the GIL of the Streamlit server. Extracted text
+is cached on disk by paper id (and in the shared object cache), so each
+paper is downloaded and parsed at most once.
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit
+
+import requests
+from pypdf import PdfReader
+
+import metrics
+from config import Config
+from object_cache import shared_cache
+from singleflight import coalesce
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+_UNSAFE_ID_CHARS = re.compile(r"[^\w.-]")
+
+
+class PDFIngestError(Exception):
+    """Raised when a PDF cannot be downloaded or parsed."""
+
+
+def paper_id_from_url(pdf_url):
+    """arXiv id from a PDF link (http://arxiv.org/pdf/2401.01234v2 ->
+    2401.01234v2), or a hash of the URL for anything else."""
+    path = urlsplit(pdf_url).path.rstrip("/")
+    if "/pdf/" in path:
+        paper_id = path.split("/pdf/", 1)[1]
+        if paper_id.endswith(".pdf"):
+            paper_id = paper_id[:-4]
+        return _UNSAFE_ID_CHARS.sub("_", paper_id)
+    return hashlib.blake2b(pdf_url.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _cache_path(paper_id, suffix):
+    os.makedirs(Config.PDF_CACHE_DIR, exist_ok=True)
+    return os.path.join(Config.PDF_CACHE_DIR, _UNSAFE_ID_CHARS.sub("_", paper_id) + suffix)
+
+
+def download_pdf(pdf_url, dest, max_bytes=None, timeout=30):
+    """Stream a PDF to dest without holding it in memory. Returns bytes written."""
+    max_bytes = max_bytes or Config.PDF_MAX_BYTES
+    partial = dest + ".part"
+    written = 0
+    try:
+        with metrics.timed("fetch.pdf"):
+            with requests.get(pdf_url, headers=HEADERS, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                with open(partial, "wb") as f:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                        written += len(chunk)
+                        if written > max_bytes:
+                            raise PDFIngestError(f"PDF larger than {max_bytes // (1024 * 1024)} MB")
+                        f.write(chunk)
+        with open(partial, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                raise PDFIngestError("Response is not a PDF")
+        os.replace(partial, dest)
+        return written
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def extract_pdf_text(path, max_pages=None):
+    """Extract the text of a PDF file. Runs inside a pool worker."""
+    started = time.perf_counter()
+    reader = PdfReader(path)
+    pages = reader.pages if not max_pages else reader.pages[:max_pages]
+    texts = []
+    for page in pages:
+        text = page.extract_text() or ""
+        if text.strip():
+            texts.append(text.strip())
+    return {
+        "text": "\n\n".join(texts),
+        "pages": len(pages),
+        "seconds": time.perf_counter() - started,
+        "worker": os.getpid(),
+    }
+
+
+# -- process pool -------------------------------------------------------
+
+_pool = None
+_pool_lock = threading.Lock()
+_worker_stats = {}  # pid -> [pages, seconds]
+_stats_lock = threading.Lock()
+
+
+def get_pool():
+    """Shared extraction pool. Workers are spawned, not forked, because the
+    Streamlit server process is multi-threaded."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=Config.PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _record(result):
+    metrics.observe("parse.pdf", result["seconds"])
+    metrics.increment("pdf_pages_total", result["pages"])
+    with _stats_lock:
+        stats = _worker_stats.setdefault(result["worker"], [0, 0.0])
+        stats[0] += result["pages"]
+        stats[1] += result["seconds"]
+
+
+def worker_stats():
+    """Pages parsed and pages/sec for each pool worker process."""
+    with _stats_lock:
+        return {
+            pid: {"pages": pages, "seconds": seconds, "pages_per_s": pages / seconds if seconds else 0.0}
+            for pid, (pages, seconds) in _worker_stats.items()
+        }
+
+
+def reset_worker_stats():
+    with _stats_lock:
+        _worker_stats.clear()
+
+
+def extract_in_pool(path, max_pages=None, timeout=None):
+    """Parse a PDF in the process pool and wait for its text."""
+    timeout = timeout or Config.PDF_EXTRACT_TIMEOUT
+    try:
+        future = get_pool().submit(extract_pdf_text, path, max_pages or Config.PDF_MAX_PAGES)
+        result = future.result(timeout=timeout)
+    except BrokenProcessPool:
+        # A worker died (e.g. a pathological PDF); start a fresh pool next time.
+        shutdown_pool()
+        metrics.record_error("parse.pdf")
+        raise PDFIngestError("PDF worker crashed")
+    except PDFIngestError:
+        raise
+    except Exception as e:
+        metrics.record_error("parse.pdf")
+        raise PDFIngestError(f"Could not parse PDF: {e}") from e
+    _record(result)
+    return result
+
+
+# -- entry point --------------------------------------------------------
+
+@coalesce("paper_text")
+@shared_cache("paper_text", ttl=86400, namespace="bodies")
+def get_paper_text(pdf_url, paper_id=None):
+    """Full text of a paper's PDF, downloading and parsing it on first use.
+
+    Raises PDFIngestError on failure so failures are not cached.
+    """
+    paper_id = paper_id or paper_id_from_url(pdf_url)
+    text_path = _cache_path(paper_id, ".txt")
+    if os.path.exists(text_path):
+        metrics.record_cache("paper_text_disk", True)
+        with open(text_path, encoding="utf-8") as f:
+            return f.read()
+    metrics.record_cache("paper_text_disk", False)
+
+    pdf_path = _cache_path(paper_id, ".pdf")
+    try:
+        try:
+            download_pdf(pdf_url, pdf_path)
+        except PDFIngestError:
+            raise
+        except Exception as e:
+            raise PDFIngestError(f"Could not download PDF: {e}") from e
+        text = extract_in_pool(pdf_path)["text"]
+    finally:
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+
+    if not text.strip():
+        raise PDFIngestError("No extractable text in PDF (scanned?)")
+    partial = text_path + ".part"
+    with open(partial, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(partial, text_path)
+    return text
@@ -0,0 +1,341 @@
+"""
+Headless scrape-and-summarize pipeline for precomputing daily digests.
+
+Runs TechCrunch, Hacker News and arXiv ingestion plus Gemini summarization
+with parallel workers, outside of the Streamlit app:
+
+    python pipeline.py --out digests/2026-10-18.jsonl
+    python pipeline.py --out digests/today.parquet --sources techcrunch,arxiv --arxiv-query "llm agents"
+    python pipeline.py --out digests/today.jsonl --resume      # continue an interrupted run
+
+Every finished item is appended to a JSONL checkpoint as soon as it is done,
+so an interrupted run can be resumed; items that failed are retried on
+resume. A .parquet output is written from the checkpoint at the end.
+
+    python pipeline.py --offline --out /tmp/digest.jsonl       # fixtures + fake Gemini, for benchmarking
+    python pipeline.py --out digests/today.jsonl --profile     # save a cProfile/tracemalloc capture
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+import dedup
+import llm_scheduler
+import metrics
+import profiler
+import related
+import triage
+from config import Config
+
+logger = logging.getLogger("pipeline")
+
+SOURCES = ("techcrunch", "hacker_news", "arxiv")
+MAX_CONTENT_CHARS = 20000
+
+
+# -- ingestion ----------------------------------------------------------
+# Each source yields item dicts: id, source, title, url, published, content.
+
+def ingest_techcrunch(max_items, pool, per_source):
+    import scraper
+
+    headlines = scraper.get_latest_headlines(max_articles=max_items)
+    session = scraper.get_session()
+    gate = threading.Semaphore(per_source)
+
+    def fetch(headline):
+        with gate:
+            article = scraper.fetch_article(headline["url"], headline["title"], session)
+        if not article:
+            return None
+        return {
+            "source": "techcrunch",
+            "title": article["title"],
+            "url": article["url"],
+            "published": article["date"],
+            "content": article["content"],
+            "category": article["category"],
+            "topics": article["topics"],
+        }
+
+    return [item for item in pool.map(fetch, headlines) if item]
+
+
+def ingest_hacker_news(max_items, pool, per_source):
+    import ii
+
+    entries = ii.fetch_hacker_news_items()[:max_items]
+    gate = threading.Semaphore(per_source)
+
+    def fetch(entry):
+        with gate:
+            content = ii.fetch_article_content(entry["link"])
+        return {
+            "source": "hacker_news",
+            "title": entry["title"],
+            "url": entry["link"],
+            "published": "",
+            "content": content or "",
+        }
+
+    return list(pool.map(fetch, entries))
+
+
+def ingest_arxiv(max_items, pool, per_source, query):
+    import app2
+
+    xml_response = app2.search_arxiv(query, max_items, "all")
+    if xml_response is None:
+        raise RuntimeError("arXiv search failed")
+    return [
+        {
+            "source": "arxiv",
+            "title": paper["title"],
+            "url": paper["link"],
+            "published": paper.get("published", ""),
+            "content": paper["summary"],
+            "authors": list(paper["authors"]),
+            "pdf_link": paper["pdf_link"],
+        }
+        for paper in app2.parse_arxiv_response(xml_response)
+    ]
+
+
+def ingest(sources, max_items, pool, per_source, arxiv_query):
+    """Run every source in parallel; a failing source is logged and skipped."""
+    runners = {
+        "techcrunch": lambda: ingest_techcrunch(max_items, pool, per_source),
+        "hacker_news": lambda: ingest_hacker_news(max_items, pool, per_source),
+        "arxiv": lambda: ingest_arxiv(max_items, pool, per_source, arxiv_query),
+    }
+    items = []
+    # Sources get their own threads: they fan out into the shared pool and
+    # would deadlock it if they ran inside it.
+    with ThreadPoolExecutor(max_workers=len(sources)) as source_pool:
+        futures = {source_pool.submit(runners[s]): s for s in sources}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                found = future.result()
+            except Exception as e:
+                metrics.record_error(f"pipeline.ingest.{source}")
+                logger.error("%s ingestion failed: %s", source, e)
+                continue
+            logger.info("%s: %d items", source, len(found))
+            items.extend(found)
+
+    index = dedup.get_index()
+    unique = {}
+    for item in items:
+        item["id"] = f"{item['source']}:{dedup.normalize_url(item['url']) or item['title']}"
+        if item["id"] in unique:
+            continue
+        item["content"] = item["content"][:MAX_CONTENT_CHARS]
+        item["cluster"] = index.add(item["id"], title=item["title"], text=item["content"],
+                                    url=item["url"], source=item["source"])
+        unique[item["id"]] = item
+    # Batch runs grow the app's related-items index too
+    related.add_many(
+        {"url": i["url"], "title": i["title"], "text": i["content"], "source": i["source"]}
+        for i in unique.values()
+    )
+    return list(unique.values())
+
+
+# -- summarization and checkpointing ------------------------------------
+
+def summarize_item(item, lane):
+    from summarizer import summarize_text
+
+    record = {k: v for k, v in item.items() if k != "content"}
+    record["content_chars"] = len(item["content"])
+    verdict = triage.assess(item["content"])
+    record["triage"] = verdict["reason"]
+    if verdict["action"] != triage.SUMMARIZE:
+        # Nothing worth summarizing (paywall, video, PDF link); keep the
+        # headline, and short texts as their own summary
+        metrics.increment("llm_calls_avoided_total", reason=verdict["reason"])
+        record["summary"] = verdict["result"] if verdict["action"] == triage.PASSTHROUGH else None
+        record["error"] = None
+        return record
+    try:
+        record["summary"] = summarize_text(item["content"], lane, strict=True)
+        record["error"] = None
+    except Exception as e:
+        record["summary"] = None
+        record["error"] = str(e)
+    return record
+
+
+def load_checkpoint(path):
+    """Records already in the checkpoint, keeping only the last one per id."""
+    records = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+                records[record["id"]] = record
+    return records
+
+
+def rewrite_checkpoint(path, records):
+    partial = path + ".tmp"
+    with open(partial, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(partial, path)
+
+
+def write_parquet(records, path):
+    try:
+        import pandas as pd
+    except ImportError:
+        raise SystemExit("Parquet output needs pandas and pyarrow (pip install pandas pyarrow)")
+    pd.DataFrame(records).to_parquet(path, index=False)
+
+
+# -- offline mode -------------------------------------------------------
+
+def start_offline():
+    """Point the fetchers at the benchmark fixture server and swap Gemini for
+    the fake model, so the pipeline can be benchmarked in isolation."""
+    import scraper
+    import ii
+    import app2
+    import llm_client
+    from benchmarks.fake_llm import FakeChatModel
+    from benchmarks.server import FixtureServer
+
+    # Fixed port so item ids (derived from URLs) are stable and --resume works
+    server = FixtureServer(port=8765).start()
+    Config.HTTP_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(Config.HTTP_CACHE_PATH)), "offline-http.sqlite")
+    Config.ARXIV_SEARCH_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(Config.HTTP_CACHE_PATH)), "offline-arxiv_search.sqlite")
+    Config.RELATED_INDEX_DIR = Config.RELATED_INDEX_DIR + "-offline"
+    scraper.LATEST_URL = f"{server.base_url}/latest/"
+    ii.HN_BASE_URL = f"{server.base_url}/hn/"
+    app2.ARXIV_API_URL = f"{server.base_url}/api/query"
+    llm_client.set_llm(FakeChatModel(latency_ms=200, tokens_per_s=300, seed=0))
+    return server
+
+
+# -- entry point --------------------------------------------------------
+
+def run(args):
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()]
+    unknown = set(sources) - set(SOURCES)
+    if unknown:
+        raise SystemExit(f"Unknown sources: {', '.join(sorted(unknown))}")
+
+    parquet = args.out.endswith(".parquet")
+    checkpoint = args.out + ".partial.jsonl" if parquet else args.out
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint)), exist_ok=True)
+
+    done = {}
+    if args.resume:
+        done = {i: r for i, r in load_checkpoint(checkpoint).items() if not r.get("error")}
+        logger.info("Resuming: %d items already summarized", len(done))
+    # Drop failed and duplicate lines so the checkpoint only holds finished items
+    rewrite_checkpoint(checkpoint, done.values())
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        with metrics.timed("pipeline.ingest"):
+            items = ingest(sources, args.max_items, pool, args.per_source, args.arxiv_query)
+        pending = [item for item in items if item["id"] not in done]
+        logger.info("%d items ingested, %d to summarize", len(items), len(pending))
+
+        lane = llm_scheduler.VISIBLE
+        failures = 0
+        triaged = 0  # answered by triage without an LLM call
+        write_lock = threading.Lock()
+        with metrics.timed("pipeline.summarize"), open(checkpoint, "a", encoding="utf-8") as out:
+            futures = [pool.submit(summarize_item, item, lane) for item in pending]
+            for n, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                record["generated_at"] = datetime.now().isoformat(timespec="seconds")
+                failures += bool(record["error"])
+                triaged += record["triage"] != "ok"
+                with write_lock:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                done[record["id"]] = record
+                if n % 10 == 0 or n == len(futures):
+                    logger.info("summarized %d/%d", n, len(futures))
+
+    # Keep digest order stable: source, then ingestion order
+    order = {item["id"]: i for i, item in enumerate(items)}
+    records = sorted(done.values(), key=lambda r: (SOURCES.index(r["source"]), order.get(r["id"], len(order))))
+    if parquet:
+        write_parquet(records, args.out)
+        os.remove(checkpoint)
+    else:
+        rewrite_checkpoint(checkpoint, records)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "items": len(items),
+        "summarized": len(pending) - failures - triaged,
+        "triaged": triaged,
+        "failed": failures,
+        "skipped": len(items) - len(pending),
+        "seconds": elapsed,
+        "items_per_s": len(pending) / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", required=True, help="Digest path (.jsonl or .parquet)")
+    parser.add_argument("--sources", default=",".join(SOURCES), help="Comma-separated subset of: " + ", ".join(SOURCES))
+    parser.add_argument("--max-items", type=int, default=20, help="Items per source")
+    parser.add_argument("--arxiv-query", default="large language models")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel fetch/summarize workers")
+    parser.add_argument("--per-source", type=int, default=3, help="Concurrent article fetches per source")
+    parser.add_argument("--rpm", type=float, help="Gemini requests per minute for this run (default: LLM_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--resume", action="store_true", help="Skip items already summarized in --out")
+    parser.add_argument("--offline", action="store_true", help="Use benchmark fixtures and a fake model")
+    parser.add_argument("--profile", action="store_true", help="Save a CPU and allocation profile of the run in PROFILE_DIR")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=Config.LOG_LEVEL, format="%(asctime)s %(levelname)s %(message)s")
+    load_dotenv()
+    if args.rpm:
+        # The app and a cron run share one API key; give the batch its own slice.
+        Config.LLM_REQUESTS_PER_MINUTE = args.rpm
+
+    server = start_offline() if args.offline else None
+    try:
+        # Also profiled when an admin armed "pipeline" in the app
+        if args.profile or profiler.take_job("pipeline"):
+            report = profiler.profile("pipeline", run, args)
+        else:
+            report = run(args)
+    finally:
+        if server:
+            server.stop()
+
+    print(
+        f"{report['items']} items: {report['summarized']} summarized, {report['triaged']} triaged, "
+        f"{report['failed']} failed, {report['skipped']} already done, "
+        f"{report['seconds']:.1f}s ({report['items_per_s']:.2f} items/s)"
+    )
+    for stage, s in metrics.snapshot()["stages"].items():
+        print(f"  {stage:<32}{s['count']:>6} calls  p50 {s['p50'] * 1000:>8.1f} ms  p95 {s['p95'] * 1000:>8.1f} ms")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+On-demand CPU and allocation profiling of a single run.
+
+An admin arms a target (a tab render function such as render_news_tab, or
+the "pipeline" batch job); its next run is captured and the target is
+disarmed again:
+- a cProfile profile
+- a tracemalloc snapshot of the memory allocated during the run
+
+Each capture is saved in PROFILE_DIR as three files:
+- <stamp>-<target>.prof: load with pstats or snakeviz
+- <stamp>-<target>.tracemalloc: load with tracemalloc.Snapshot.load
+- <stamp>-<target>.json: top hotspots, shown in the Performance panel
+
+Tab functions are wrapped with @profiled(target) below @st.fragment, so
+both full reruns and widget-triggered fragment reruns of an armed tab are
+captured. Targets that aren't armed cost one set lookup per call, so the
+hooks cost nothing when profiling is off.
+
+Jobs run in their own process, so arming one writes a marker file there,
+and the job removes it when it starts.
+
+Limits:
+- Only one capture runs at a time. A run that finds the profiler busy is
+  not captured and stays armed.
+- tracemalloc is process-wide, so allocations of other threads during the
+  run are included.
+- From Python 3.12, cProfile records calls in every thread, and its stats
+  don't say which thread made them. A tab capture then also includes other
+  sessions' reruns and background threads that ran at the same time, so
+  capture on a quiet server when the numbers must be exact.
+"""
+import cProfile
+import functools
+import glob
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import metrics
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+JOB_TARGETS = ("pipeline",)
+
+_armed = set()  # in-process targets to capture on their next run
+_busy = threading.Lock()
+
+
+def arm(target):
+    """Capture the next run of `target`."""
+    if target in JOB_TARGETS:
+        os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+        open(_marker(target), "w").close()
+    else:
+        _armed.add(target)
+
+
+def disarm(target):
+    _armed.discard(target)
+    if target in JOB_TARGETS and os.path.exists(_marker(target)):
+        os.remove(_marker(target))
+
+
+def armed():
+    """Targets waiting for their next run."""
+    return sorted(_armed | {t for t in JOB_TARGETS if os.path.exists(_marker(t))})
+
+
+def take_job(target):
+    """Consume a job's marker; True if the job should be profiled."""
+    try:
+        os.remove(_marker(target))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _marker(target):
+    return os.path.join(Config.PROFILE_DIR, f"armed.{target}")
+
+
+def call(target, func, *args, **kwargs):
+    """Run func, profiling it if `target` is armed."""
+    if target not in _armed:
+        return func(*args, **kwargs)
+    if not _busy.acquire(blocking=False):
+        return func(*args, **kwargs)
+    try:
+        _armed.discard(target)
+        return _capture(target, func, args, kwargs, follow_threads=False)
+    finally:
+        _busy.release()
+
+
+def profiled(target):
+    """Decorator form of call(). Place it below @st.fragment so the
+    fragment's own reruns pass through it too."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return call(target, func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile(target, func, *args, follow_threads=True, **kwargs):
+    """Always profile func, for jobs started with --profile or an armed
+    marker. follow_threads also profiles threads func starts; those keep
+    profiling until they exit, so only use it for short-lived processes."""
+    with _busy:
+        return _capture(target, func, args, kwargs, follow_threads)
+
+
+def _capture(target, func, args, kwargs, follow_threads):
+    profilers = [cProfile.Profile()]
+    # Before 3.12 a profiler only sees the thread that enabled it, so new
+    # threads get their own; from 3.12 on one profiler sees every thread.
+    follow = follow_threads and sys.version_info < (3, 12)
+    if follow:
+        def start_thread_profiler(*_):
+            sys.setprofile(None)
+            thread_profiler = cProfile.Profile()
+            profilers.append(thread_profiler)
+            thread_profiler.enable()
+        threading.setprofile(start_thread_profiler)
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(Config.PROFILE_TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    started_at = datetime.now()
+    start = time.perf_counter()
+    profilers[0].enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profilers[0].disable()
+        seconds = time.perf_counter() - start
+        if follow:
+            threading.setprofile(None)
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            path = _save(target, started_at, seconds, profilers, before, after, peak)
+            logger.info("Profiled %s in %.2fs: %s", target, seconds, path)
+        except Exception:
+            logger.exception("Could not save the profile of %s", target)
+            metrics.record_error("profiler.save")
+        metrics.increment("profiles_captured_total", target=target)
+
+
+def _short_path(path):
+    """Repo-relative path for this project's files, the last two parts otherwise."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    if path.startswith(root + os.sep):
+        return os.path.relpath(path, root)
+    return os.path.join(*path.split(os.sep)[-2:]) if os.sep in path else path
+
+
+def _hotspots(stats, top):
+    rows = []
+    for (path, line, name), (_, calls, self_s, cum_s, _) in stats.stats.items():
+        rows.append({
+            "function": f"{name} ({_short_path(path)}:{line})" if line else name,
+            "calls": calls,
+            "self_s": round(self_s, 4),
+            "cum_s": round(cum_s, 4),
+        })
+    rows.sort(key=lambda r: r["self_s"], reverse=True)
+    return rows[:top]
+
+
+def _allocations(before, after, top):
+    # Leave out the profiler's own bookkeeping
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    rows = []
+    for stat in sorted(diff, key=lambda s: s.size_diff, reverse=True)[:top]:
+        frame = stat.traceback[0]
+        rows.append({
+            "line": f"{_short_path(frame.filename)}:{frame.lineno}",
+            "kib": round(stat.size_diff / 1024, 1),
+            "blocks": stat.count_diff,
+        })
+    return rows
+
+
+def _save(target, started_at, seconds, profilers, before, after, peak):
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    base = os.path.join(Config.PROFILE_DIR, f"{started_at:%Y%m%d-%H%M%S-%f}-{target}")
+
+    stats = pstats.Stats(profilers[0], stream=io.StringIO())
+    for thread_profiler in profilers[1:]:
+        thread_profiler.create_stats()
+        stats.add(thread_profiler)
+    stats.dump_stats(base + ".prof")
+    after.dump(base + ".tracemalloc")
+
+    summary = {
+        "target": target,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "seconds": round(seconds, 3),
+        "threads": len(profilers),
+        "peak_mib": round(peak / 2**20, 1),
+        "hotspots": _hotspots(stats, Config.PROFILE_TOP_N),
+        "allocations": _allocations(before, after, Config.PROFILE_TOP_N),
+    }
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    _prune()
+    return base + ".prof"
+
+
+def _prune():
+    for path in captures()[Config.PROFILE_KEEP:]:
+        for ext in (".json", ".prof", ".tracemalloc"):
+            if os.path.exists(path + ext):
+                os.remove(path + ext)
+
+
+def captures():
+    """Saved captures, newest first, as paths without extension."""
+    paths = glob.glob(os.path.join(Config.PROFILE_DIR, "*.json"))
+    return [p[:-len(".json")] for p in sorted(paths, reverse=True)]
+
+
+def load_summary(path):
+    with open(path + ".json", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,330 @@
+"""
+Related items across News, Hacker News, arXiv results and Bookmarks.
+
+Items are embedded on the CPU with a signed hashing vectorizer (title words
+count double, sublinear term frequency, word pairs included) into DIM-wide
+unit vectors. The index lives in RELATED_INDEX_DIR:
+- vectors are stored as float16 in one file
+- a 256-bit SimHash of each vector is stored in a second file
+- ids and display metadata are in SQLite
+
+Both files are memory-mapped, so opening an index of any size is instant
+and a lookup only reads the rows it touches. A lookup ranks every item by
+Hamming distance to the query's SimHash (a few ms at 100k items) and
+re-ranks the closest RELATED_CANDIDATES by cosine similarity.
+
+Items are keyed by normalized URL, so a story reached from several tabs
+is one item, and it is re-embedded when a longer body arrives.
+"""
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from urllib.parse import urlsplit
+
+import numpy as np
+
+import dedup
+import metrics
+from config import Config
+
+DIM = 256
+# SimHash width; 64 bits is too coarse to tell a 0.45 cosine neighbour from
+# noise in a 512-item shortlist
+CODE_BITS = 256
+CODE_WORDS = CODE_BITS // 64
+MAX_WORDS = 600
+# Scores above this are copies of the same story, which render_copies
+# already links
+DUPLICATE_SCORE = 0.95
+
+_SEED = 0x5EED
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "the and for with that this from are was were has have had not but its into their they them you "
+    "your our about more than will can also been which what when who how all one new said says just "
+    "over after before out now some like get use using used make may most other only such there these "
+    "those then would could should very much many any each way while where".split()
+)
+_PLANES = np.random.default_rng(_SEED).standard_normal((DIM, CODE_BITS)).astype(np.float32)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def item_id(url):
+    """Normalized URL; the query is kept since it identifies HN and some
+    other pages (item?id=...)."""
+    key = dedup.normalize_url(url)
+    query = urlsplit(url or "").query
+    return f"{key}?{query}" if key and query else key
+
+
+def _features(title, text):
+    counts = {}
+    for weight, source in ((2.0, title), (1.0, text)):
+        words = [w for w in _WORD.findall((source or "").lower()) if len(w) > 2 and w not in _STOPWORDS]
+        words = words[:MAX_WORDS]
+        for word in words:
+            counts[word] = counts.get(word, 0.0) + weight
+        for a, b in zip(words, words[1:]):
+            pair = f"{a} {b}"
+            counts[pair] = counts.get(pair, 0.0) + weight / 2
+    return counts
+
+
+def embed(title="", text=""):
+    """Unit-length float32 vector of a document (all zeros if it has no words)."""
+    counts = _features(title, text)
+    vector = np.zeros(DIM, dtype=np.float32)
+    if not counts:
+        return vector
+    slots = np.empty(len(counts), dtype=np.int64)
+    weights = np.empty(len(counts), dtype=np.float32)
+    for i, (feature, count) in enumerate(counts.items()):
+        h = zlib.crc32(feature.encode("utf-8"))
+        slots[i] = h % DIM
+        weights[i] = (1.0 + math.log(count)) * (1.0 if h & 0x80000000 else -1.0)
+    np.add.at(vector, slots, weights)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def simhash(vectors):
+    """Sign-of-projection codes for a (n, DIM) array, as (n, CODE_WORDS) uint64."""
+    bits = (np.asarray(vectors, dtype=np.float32) @ _PLANES) > 0
+    return np.packbits(bits, axis=1, bitorder="little").view(np.uint64)
+
+
+def _hamming(codes, code):
+    diff = np.bitwise_xor(codes, code)
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(diff).sum(axis=1, dtype=np.uint16)
+    return _POPCOUNT[diff.view(np.uint8)].sum(axis=1, dtype=np.uint16)
+
+
+class RelatedIndex:
+    """Append-only vector index on disk; safe to share between threads and
+    between processes writing the same directory."""
+
+    VECTORS_FILE = "vectors.f16"
+    CODES_FILE = "codes.u64"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._conn = None
+        self._vectors = None  # memory maps, remapped when the files grow
+        self._codes = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self._path("items.sqlite"), check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                " row INTEGER PRIMARY KEY, id TEXT UNIQUE, title TEXT, url TEXT, source TEXT, chars INTEGER)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            # Vectors from a different embedding can't be compared; start over
+            layout = f"{DIM}/{CODE_BITS}/{_SEED}"
+            stored = conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+            if stored and stored[0] != layout:
+                conn.execute("DELETE FROM items")
+                self._truncate()
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('layout', ?)", (layout,))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _truncate(self):
+        self._vectors = self._codes = None
+        for name in (self.VECTORS_FILE, self.CODES_FILE):
+            open(self._path(name), "wb").close()
+
+    def _rows(self, db):
+        return db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM items").fetchone()[0]
+
+    def _mapped(self, rows):
+        if self._codes is None or len(self._codes) < rows:
+            self._vectors = np.memmap(self._path(self.VECTORS_FILE), dtype=np.float16, mode="r", shape=(rows, DIM))
+            self._codes = np.memmap(self._path(self.CODES_FILE), dtype=np.uint64, mode="r", shape=(rows, CODE_WORDS))
+        return self._vectors[:rows], self._codes[:rows]
+
+    def _write(self, name, row, array):
+        path = self._path(name)
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+            f.seek(row * array[0].nbytes)
+            f.write(array.tobytes())
+
+    def _store(self, row, vectors):
+        self._write(self.VECTORS_FILE, row, vectors.astype(np.float16))
+        self._write(self.CODES_FILE, row, simhash(vectors))
+
+    # -- ingestion --------------------------------------------------------
+
+    def add_many(self, items):
+        """Index dicts with url, title, text and source. Known items are only
+        re-embedded when their text got longer. Returns the number of new items."""
+        by_id = {}
+        for item in items:
+            key = item_id(item.get("url"))
+            if key:
+                by_id[key] = item
+        if not by_id:
+            return 0
+
+        with self._lock:
+            known = self._known(self._db(), list(by_id))
+        todo = [
+            (key, item, len(item.get("text") or ""))
+            for key, item in by_id.items()
+            if key not in known or len(item.get("text") or "") > known[key]
+        ]
+        if not todo:
+            return 0
+        # Embedding is the slow part; keep it outside the lock
+        vectors = np.stack([embed(item.get("title", ""), item.get("text", "")) for _, item, _ in todo])
+
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")  # also serializes writers in other processes
+            try:
+                known = self._known(db, [key for key, _, _ in todo])
+                start = self._rows(db)
+                new, updates = [], []
+                for (key, item, chars), vector in zip(todo, vectors):
+                    if key not in known:
+                        db.execute(
+                            "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                            (start + len(new), key, item.get("title", ""), item["url"], item.get("source", ""), chars),
+                        )
+                        new.append(vector)
+                    elif chars > known[key]:
+                        row = db.execute("SELECT row FROM items WHERE id = ?", (key,)).fetchone()[0]
+                        db.execute("UPDATE items SET title = ?, chars = ? WHERE row = ?", (item.get("title", ""), chars, row))
+                        updates.append((row, vector))
+                if new:
+                    self._store(start, np.stack(new))
+                for row, vector in updates:
+                    self._store(row, vector[None])
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+        metrics.increment("related_items_indexed_total", len(new))
+        return len(new)
+
+    def _known(self, db, keys):
+        known = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            known.update(db.execute(f"SELECT id, chars FROM items WHERE id IN ({marks})", chunk).fetchall())
+        return known
+
+    # -- lookups ----------------------------------------------------------
+
+    def nearest(self, vector, k=10, candidates=None):
+        """(row, cosine) pairs of the k approximate nearest items."""
+        candidates = candidates or Config.RELATED_CANDIDATES
+        with self._lock:
+            rows = self._rows(self._db())
+            if not rows:
+                return []
+            vectors, codes = self._mapped(rows)
+        distances = _hamming(codes, simhash(vector[None])[0])
+        if rows > candidates:
+            shortlist = np.argpartition(distances, candidates - 1)[:candidates]
+            shortlist.sort()  # read the memory map in file order
+        else:
+            shortlist = np.arange(rows)
+        scores = vectors[shortlist].astype(np.float32) @ vector
+        order = np.argsort(-scores)[:k]
+        return [(int(shortlist[i]), float(scores[i])) for i in order]
+
+    def related(self, url, title="", text="", k=None):
+        """Items similar to the one at `url`. Items that aren't indexed are
+        embedded from `title` and `text` on the fly."""
+        k = k or Config.RELATED_RESULTS
+        key = item_id(url)
+        with metrics.timed("related.lookup"):
+            with self._lock:
+                db = self._db()
+                hit = db.execute("SELECT row FROM items WHERE id = ?", (key,)).fetchone() if key else None
+                if hit:
+                    vectors, _ = self._mapped(self._rows(db))
+                    vector = vectors[hit[0]].astype(np.float32)
+            if not hit:
+                vector = embed(title, text)
+            if not vector.any():
+                return []
+
+            # Extra neighbours make up for the item itself and its copies
+            scored = self.nearest(vector, k + 5)
+            with self._lock:
+                rows = [row for row, _ in scored]
+                marks = ",".join("?" * len(rows))
+                meta = {
+                    row: (id_, title_, url_, source)
+                    for row, id_, title_, url_, source in self._db().execute(
+                        f"SELECT row, id, title, url, source FROM items WHERE row IN ({marks})", rows
+                    )
+                }
+        results = []
+        for row, score in scored:
+            if row not in meta or score < Config.RELATED_MIN_SCORE or score > DUPLICATE_SCORE:
+                continue
+            id_, title_, url_, source = meta[row]
+            if id_ == key or (title and title_ == title):
+                continue
+            results.append({"title": title_, "url": url_, "source": source, "score": score})
+            if len(results) == k:
+                break
+        return results
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM items")
+            db.commit()
+            self._truncate()
+
+    def stats(self):
+        with self._lock:
+            db = self._db()
+            entries = db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        size = sum(
+            os.path.getsize(self._path(name))
+            for name in (self.VECTORS_FILE, self.CODES_FILE, "items.sqlite")
+            if os.path.exists(self._path(name))
+        )
+        return {"entries": entries, "bytes": size}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = RelatedIndex(Config.RELATED_INDEX_DIR)
+        return _index
+
+
+def add(url, title="", text="", source=""):
+    return get_index().add_many([{"url": url, "title": title, "text": text, "source": source}])
+
+
+def add_many(items):
+    return get_index().add_many(items)
+
+
+def related(url, title="", text="", k=None):
+    return get_index().related(url, title, text, k)
@@ -0,0 +1,180 @@
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+
+from duckduckgo_search import DDGS
+
+from scraper import get_latest_headlines
+from ii import fetch_hacker_news_items
+from app2 import search_arxiv, parse_arxiv_response
+import dedup
+
+logger = logging.getLogger(__name__)
+
+# Seconds each source may take before its results are dropped. The DuckDuckGo
+# search was the only source before, so the others get a shorter leash and the
+# whole stage still finishes within the time of that single search.
+SOURCE_DEADLINES = {
+    "ddgs": 6.0,
+    "techcrunch": 4.0,
+    "hacker_news": 4.0,
+    "arxiv": 5.0,
+}
+
+MAX_HITS_PER_SOURCE = 3
+
+# Shared pool so a slow source never blocks the caller: late futures keep
+# running in the background (and warm the caches) but are simply ignored.
+# Every source call has a request timeout under its deadline, so a worker
+# is never held much longer than that and the queue drains under load.
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="retrieval")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or the to vs what when why with new news latest".split()
+)
+
+
+def _request_timeout(name):
+    """Timeout for one request of a source, a second under its deadline."""
+    return max(1.0, SOURCE_DEADLINES[name] - 1.0)
+
+
+def _topic_terms(topic):
+    # Short terms such as "ai", "5g" or "ml" are kept; only filler words go
+    return [t for t in re.findall(r"\w+", topic.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def _title_score(title, terms):
+    """Count how many topic terms appear in a title. Terms of up to three
+    characters must match a whole word ("ai" shouldn't match "said")."""
+    title_lower = title.lower()
+    words = set(re.findall(r"\w+", title_lower))
+    return sum(1 for term in terms if (term in words if len(term) <= 3 else term in title_lower))
+
+
+def _best_matches(items, topic, limit):
+    terms = _topic_terms(topic)
+    if not terms:
+        return []
+    scored = [(_title_score(item["title"], terms), item) for item in items]
+    scored = [pair for pair in scored if pair[0] > 0]
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [item for _, item in scored[:limit]]
+
+
+def search_ddgs(topic, limit=MAX_HITS_PER_SOURCE):
+    with DDGS(timeout=_request_timeout("ddgs")) as ddg:
+        results = ddg.text(f"{topic} news {datetime.now().strftime('%Y-%m')}", max_results=limit) or []
+    return [
+        {"title": r["title"], "url": r["href"], "snippet": r["body"]}
+        for r in results
+    ]
+
+
+def search_techcrunch(topic, limit=MAX_HITS_PER_SOURCE):
+    headlines = get_latest_headlines(timeout=_request_timeout("techcrunch"))
+    return [
+        {"title": h["title"], "url": h["url"], "snippet": h["title"]}
+        for h in _best_matches(headlines, topic, limit)
+    ]
+
+
+def search_hacker_news(topic, limit=MAX_HITS_PER_SOURCE):
+    items = fetch_hacker_news_items(_timeout=_request_timeout("hacker_news"))
+    return [
+        {"title": i["title"], "url": i["link"], "snippet": i["title"]}
+        for i in _best_matches(items, topic, limit)
+    ]
+
+
+def search_arxiv_papers(topic, limit=MAX_HITS_PER_SOURCE):
+    papers = parse_arxiv_response(search_arxiv(topic, limit, "all", _timeout=_request_timeout("arxiv")))
+    return [
+        {"title": p["title"], "url": p["link"], "snippet": p["summary"]}
+        for p in papers[:limit]
+    ]
+
+
+SOURCES = {
+    "ddgs": search_ddgs,
+    "techcrunch": search_techcrunch,
+    "hacker_news": search_hacker_news,
+    "arxiv": search_arxiv_papers,
+}
+
+
+def _normalize_title(title):
+    return " ".join(re.findall(r"\w+", (title or "").lower()))
+
+
+def merge_hits(hits):
+    """Drop hits that point at the same page or carry the same title,
+    keeping the first (highest priority) copy."""
+    seen_urls = set()
+    seen_titles = set()
+    merged = []
+    for hit in hits:
+        url_key = dedup.normalize_url(hit["url"])
+        title_key = _normalize_title(hit["title"])
+        if (url_key and url_key in seen_urls) or (title_key and title_key in seen_titles):
+            continue
+        seen_urls.add(url_key)
+        seen_titles.add(title_key)
+        merged.append(hit)
+    return merged
+
+
+def gather(topic, sources=None, deadlines=None):
+    """Query all sources concurrently and return the merged hits that
+    arrived before each source's deadline."""
+    sources = sources or SOURCES
+    deadlines = {**SOURCE_DEADLINES, **(deadlines or {})}
+    started = time.monotonic()
+
+    futures = {
+        name: _executor.submit(fetch, topic)
+        for name, fetch in sources.items()
+    }
+
+    hits = []
+    for name, future in futures.items():
+        remaining = deadlines.get(name, 5.0) - (time.monotonic() - started)
+        try:
+            results = future.result(timeout=max(remaining, 0))
+        except FutureTimeoutError:
+            # A call still queued behind other sessions' work is dropped
+            future.cancel()
+            logger.warning("Retrieval source '%s' missed its deadline", name)
+            continue
+        except Exception as e:
+            logger.warning("Retrieval source '%s' failed: %s", name, e)
+            continue
+        for result in results:
+            hits.append({**result, "source": name})
+
+    return drop_near_duplicates(merge_hits(hits))
+
+
+def drop_near_duplicates(hits):
+    """Keep one hit per near-duplicate cluster. Hits are also indexed so the
+    TechCrunch and HN tabs can link to the same story."""
+    index = dedup.get_index()
+    seen = set()
+    unique = []
+    for hit in hits:
+        cluster = index.add(hit["url"], title=hit["title"], text=hit["snippet"], url=hit["url"], source=hit["source"])
+        if cluster in seen:
+            continue
+        seen.add(cluster)
+        unique.append(hit)
+    return unique
+
+
+def format_hits(hits):
+    return "\n\n".join(
+        f"Title: {hit['title']}\nURL: {hit['url']}\nSource: {hit['source']}\nSummary: {hit['snippet']}"
+        for hit in hits
+    )
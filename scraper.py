@@ -1,4 +1,5 @@
 import datetime
+import logging
 import time
 import requests
 from bs4 import BeautifulSoup
@@ -6,6 +7,11 @@ from urllib3.util.retry import Retry
 from dateutil.parser import parse
 from requests.adapters import HTTPAdapter
 import random
+import metrics
+from singleflight import coalesce
+import http_cache
+
+logger = logging.getLogger(__name__)
 
 def get_session():
     """This function creates a customized requests 
@@ -22,82 +28,135 @@ def get_session():
     session.mount("https://", adapter)
     return session
 
-def get_latest_news(max_articles=20):
-    url = f"https://techcrunch.com/latest/"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Connection": "keep-alive",
+LATEST_URL = "https://techcrunch.com/latest/"
+
+# Random pause between article requests, in seconds
+ARTICLE_DELAY = (1, 3)
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+}
+
+def parse_listing_page(html):
+    """Return the title links on a TechCrunch listing page (with their
+    publish time when the card has one) and the next page's URL, if any."""
+    with metrics.timed("parse.techcrunch_listing"):
+        soup = BeautifulSoup(html, 'html.parser')
+        cards = []
+        for link in soup.find_all("a", class_="loop-card__title-link"):
+            card = link.find_parent("div", class_="loop-card")
+            time_tag = card.find("time") if card else None
+            cards.append({
+                "title": link.get_text(strip=True),
+                "url": link.get("href"),
+                "published": time_tag.get("datetime") if time_tag else None,
+            })
+        next_link = soup.find("a", class_="wp-block-query-pagination-next")
+        return cards, next_link.get("href") if next_link else None
+
+def parse_listing(html):
+    """Return the title links from a TechCrunch listing page."""
+    return parse_listing_page(html)[0]
+
+@metrics.timed("parse.techcrunch_article")
+def parse_article(html, article_url, article_title):
+    """Extract author, date, category, body and topics from an article page."""
+    article_soup = BeautifulSoup(html, 'html.parser')
+
+    try:
+        author = article_soup.find("a", class_="wp-block-tc23-author-card-name__link").get_text(strip=True)
+    except (AttributeError, TypeError):
+        author = "Unknown"
+
+    try:
+        date = article_soup.find("time").get_text(strip=True)
+    except (AttributeError, TypeError):
+        date = "Unknown" 
+
+    try:
+        content_div = article_soup.find("div", class_="entry-content wp-block-post-content is-layout-constrained wp-block-post-content-is-layout-constrained")
+        paragraphs = content_div.find_all("p")
+        full_content = "\n".join([p.get_text(strip=True) for p in paragraphs])
+    except (AttributeError, TypeError):
+        full_content = "content not available"
+
+    try:
+        topic_list = []
+        topics = article_soup.find("div", class_="tc23-post-relevant-terms__terms").find_all("a")
+        for topic in topics:
+            topic_list.append(topic.get_text(strip=True))
+    except (AttributeError, TypeError):
+        topic_list = ["topic not available"]
+   
+    try:
+        category = article_soup.find("a", class_="is-taxonomy-category wp-block-tenup-post-primary-term").get_text(strip=True)
+    except (AttributeError, TypeError):
+        category = "Unknown"
+
+    return {
+        "title": article_title,
+        "url": article_url,
+        "author": author,
+        "date": date,
+        "category": category,
+        "content": full_content,
+        "topics": topic_list
     }
+
+@coalesce("techcrunch_headlines")
+def get_latest_headlines(max_articles=20, timeout=15):
+    """Fetch only the titles and links from the TechCrunch listing page,
+    without visiting each article."""
+    url = LATEST_URL
+    try:
+        with metrics.timed("fetch.techcrunch_listing"):
+            response = requests.get(url, headers=HEADERS, timeout=timeout)
+            response.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning("Failed to fetch main page: %s", e)
+        return []
+
+    return parse_listing(response.content)[:max_articles]
+
+def fetch_article(article_url, article_title, session=None, timeout=15):
+    """Fetch and parse one article page; None if the request fails."""
+    session = session or get_session()
+    try:
+        with metrics.timed("fetch.techcrunch_article"):
+            article_response = http_cache.get(article_url, headers=HEADERS, timeout=timeout, session=session)
+            article_response.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning("Failed to fetch article: %s - %s", article_url, e)
+        return None
+    return parse_article(article_response.content, article_url, article_title)
+
+def get_latest_news(max_articles=20, delay=None):
+    url = LATEST_URL
+    delay = delay or ARTICLE_DELAY
+    headers = HEADERS
     session = get_session()
 
     try:
-        response = session.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
+        with metrics.timed("fetch.techcrunch_listing"):
+            response = session.get(url, headers=headers, timeout=15)
+            response.raise_for_status()
     except requests.RequestException as e:
-        print(f"Failed to fetch main page: {e}")
+        logger.warning("Failed to fetch main page: %s", e)
         return []
     
-    soup = BeautifulSoup(response.content, 'html.parser')
-    articles = soup.find_all("a", class_="loop-card__title-link")[:max_articles]
+    articles = parse_listing(response.content)[:max_articles]
     result = []
 
     for article in articles:
-        article_url = article.get("href")
-        article_title = article.get_text(strip=True)
-        
-        # Add random delay between requests (1-3 seconds)
-        time.sleep(random.uniform(1, 3))
+        # Add random delay between requests (1-3 seconds by default)
+        time.sleep(random.uniform(*delay))
         
-        try:
-            article_response = session.get(article_url, headers=headers, timeout=15)
-            article_response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Failed to fetch article: {article_url} - {e}")
-            continue
-            
-        article_soup = BeautifulSoup(article_response.content, 'html.parser')
-
-        try:
-            author = article_soup.find("a", class_="wp-block-tc23-author-card-name__link").get_text(strip=True)
-        except (AttributeError, TypeError):
-            author = "Unknown"
-
-        try:
-            date = article_soup.find("time").get_text(strip=True)
-        except (AttributeError, TypeError):
-            date = "Unknown" 
-
-        try:
-            content_div = article_soup.find("div", class_="entry-content wp-block-post-content is-layout-constrained wp-block-post-content-is-layout-constrained")
-            paragraphs = content_div.find_all("p")
-            full_content = "\n".join([p.get_text(strip=True) for p in paragraphs])
-        except (AttributeError, TypeError):
-            full_content = "content not available"
-
-        try:
-            topic_list = []
-            topics = article_soup.find("div", class_="tc23-post-relevant-terms__terms").find_all("a")
-            for topic in topics:
-                topic_list.append(topic.get_text(strip=True))
-        except (AttributeError, TypeError):
-            topic_list = ["topic not available"]
-       
-        try:
-            category = article_soup.find("a", class_="is-taxonomy-category wp-block-tenup-post-primary-term").get_text(strip=True)
-        except (AttributeError, TypeError):
-            category = "Unknown"
-
-        result.append({
-            "title": article_title,
-            "url": article_url,
-            "author": author,
-            "date": date,
-            "category": category,
-            "content": full_content,
-            "topics": topic_list
-        })
+        parsed = fetch_article(article["url"], article["title"], session)
+        if parsed:
+            result.append(parsed)
 
     return result
 
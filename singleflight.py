@@ -0,0 +1,88 @@
+"""
+Single-flight request coalescing: concurrent calls with the same key share
+one execution instead of each missing the cache and doing the work again.
+"""
+import functools
+import threading
+from concurrent.futures import Future
+
+import metrics
+
+
+class _LeaderAborted(Exception):
+    """The leading call was interrupted by a control-flow exception (e.g.
+    Streamlit's rerun/stop); waiting callers retry instead of inheriting it."""
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; callers that arrive while a
+    call is in flight block on the same future and get its result (or its
+    exception).
+
+    Only Exceptions are shared. Other BaseExceptions, such as Streamlit's
+    RerunException and StopException, belong to the leader's thread. The
+    waiting callers then retry, and one of them becomes the new leader.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._calls[key] = future
+            if leader:
+                break
+            metrics.increment("singleflight_coalesced_total", group=self.name)
+            try:
+                return future.result()
+            except _LeaderAborted:
+                continue
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._forget(key)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            self._forget(key)
+            future.set_exception(_LeaderAborted())
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    def _forget(self, key):
+        with self._lock:
+            del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+def coalesce(name):
+    """Decorator form of SingleFlight keyed on the call's arguments.
+
+    Place it above the cache decorator so that concurrent misses for the
+    same arguments wait for one fill instead of all recomputing.
+    """
+    group = SingleFlight(name)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return group.do(key, func, *args, **kwargs)
+        wrapper.single_flight = group
+        if hasattr(func, "clear"):
+            wrapper.clear = func.clear
+        return wrapper
+    return decorator
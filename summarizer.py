@@ -1,31 +1,121 @@
-import streamlit as st
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 import os
+import metrics
+import llm_scheduler
+import dedup
+import triage
+from compression import estimate_tokens
+from config import Config
+from singleflight import coalesce
+from object_cache import shared_cache
 
-GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
+@coalesce("summaries")
+@shared_cache("summaries", ttl=86400, namespace="summaries")  # Cache for 24 hours since summaries don't change
+def _summarize(text, _lane):
+    """Cached Gemini summary. Raises on failure so errors are not cached;
+    _lane is excluded from the cache key."""
+    prompt = f"""
+    Summarize the following text in 3-5 sentences. Keep it professional and informative.
+    
+    Text:
+    {text}
+    
+    Instructions:
+    1. Focus on the main points and key information
+    2. Use clear and concise language
+    3. Maintain the original meaning
+    4. Include relevant technical terms and their simple explanations
+    5. Format the summary in markdown
+    """
+    
+    with metrics.timed("llm.summarize"):
+        response = llm_scheduler.invoke(prompt, _lane)
+    return response.content.strip()
 
-@st.cache_data(ttl=86400)  # Cache for 24 hours since summaries don't change
-def summarize_text(text):
-    """Summarize text using Google's Gemini model."""
+def summarize_text(text, lane=llm_scheduler.VISIBLE, strict=False):
+    """Summarize text using Google's Gemini model. With strict=True errors
+    are raised instead of returned as a message."""
+    # Placeholders, paywall stubs and very short texts never reach Gemini
+    local = triage.screen(text)
+    if local is not None:
+        return local
     try:
-        model = ChatGoogleGenerativeAI(model="gemini-2.0-flash",google_api_key=GOOGLE_API_KEY)
-        
-        prompt = f"""
-        Summarize the following text in 3-5 sentences. Keep it professional and informative.
-        
-        Text:
-        {text}
-        
-        Instructions:
-        1. Focus on the main points and key information
-        2. Use clear and concise language
-        3. Maintain the original meaning
-        4. Include relevant technical terms and their simple explanations
-        5. Format the summary in markdown
-        """
-        
-        response = model.invoke(prompt)
-        return response.content.strip()
+        # Near-duplicate copies of a story share the summary of the fullest copy
+        canonical = dedup.get_index().canonical_text(text)
+        if canonical != text:
+            metrics.increment("dedup_summaries_reused_total")
+        return _summarize(canonical, lane)
     except Exception as e:
+        if strict:
+            raise
         return f"[Could not summarize content: {str(e)}]"
+
+def chunk_text(text, max_tokens):
+    """Split text into chunks of at most ~max_tokens, on paragraph
+    boundaries where possible."""
+    chunks = []
+    current = []
+    size = 0
+    for paragraph in text.split("\n\n"):
+        tokens = estimate_tokens(paragraph)
+        if tokens > max_tokens:
+            # A single huge paragraph (common in extracted PDF text)
+            step = max_tokens * 4
+            pieces = [paragraph[i:i + step] for i in range(0, len(paragraph), step)]
+        else:
+            pieces = [paragraph]
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and size + piece_tokens > max_tokens:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def summarize_long_text(text, lane=llm_scheduler.VISIBLE):
+    """Summarize text too long for one prompt (e.g. a full paper): each
+    chunk is summarized, then the chunk summaries are summarized together.
+    Only the first PDF_MAX_CHUNKS chunks are used to bound Gemini calls."""
+    local = triage.screen(text)
+    if local is not None:
+        return local
+    try:
+        chunks = chunk_text(text, Config.PDF_CHUNK_TOKENS)[:Config.PDF_MAX_CHUNKS]
+        if len(chunks) <= 1:
+            return _summarize(text, lane)
+        metrics.increment("summaries_chunked_total")
+        partials = [_summarize(chunk, lane) for chunk in chunks]
+        return _summarize("\n\n".join(partials), lane)
+    except Exception as e:
+        return f"[Could not summarize content: {str(e)}]"
+
+@coalesce("discussion_summaries")
+@shared_cache("discussion_summaries", ttl=3600, namespace="summaries")  # Threads keep growing; 1 hour
+def _summarize_discussion(title, thread, _lane):
+    prompt = f"""
+    Summarize the Hacker News discussion below about "{title}" in 4-6 bullet points.
+    Each line is one comment ("- author: text"); indentation marks replies.
+    
+    Discussion:
+    {thread}
+    
+    Instructions:
+    1. Capture the main viewpoints, agreements and disagreements
+    2. Mention notable facts, experiences or links commenters bring up
+    3. Don't attribute points to individual usernames
+    4. Format the summary in markdown
+    """
+    
+    with metrics.timed("llm.summarize_discussion"):
+        response = llm_scheduler.invoke(prompt, _lane)
+    return response.content.strip()
+
+def summarize_discussion(title, thread, lane=llm_scheduler.VISIBLE):
+    """Summarize a flattened comment thread (see hn_comments.format_thread)."""
+    try:
+        return _summarize_discussion(title, thread, lane)
+    except Exception as e:
+        return f"[Could not summarize discussion: {str(e)}]"
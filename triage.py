@@ -0,0 +1,143 @@
+"""
+Cheap checks run before a text is sent to Gemini for summarizing.
+
+Extraction often yields nothing worth summarizing:
+- the scraper's "content not available" placeholder
+- cookie or consent walls and paywall stubs
+- near-empty Hacker News link bodies
+- navigation menus and other non-prose
+
+assess() scores a text for placeholder markers, boilerplate ratio,
+whether it reads as prose, and length. It decides whether to summarize
+it, show it as-is (too short to need a summary) or show a short local
+note instead. Every avoided call is counted in llm_calls_avoided_total.
+"""
+import re
+
+import metrics
+from config import Config
+
+SUMMARIZE = "summarize"
+PASSTHROUGH = "passthrough"  # short enough to show as-is
+SKIP = "skip"                # nothing worth showing
+
+# Only the start of a long text is scored
+SAMPLE_CHARS = 20000
+
+# Letter runs; CJK characters count one each since those scripts don't
+# separate words with spaces
+_WORD = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]|[^\W\d_]+")
+_LINE_SPLIT = re.compile(r"\n+|(?<=[.!?])\s+")
+
+# Fillers used when extraction fails (scraper.parse_article and friends)
+_PLACEHOLDERS = (
+    "content not available",
+    "no content available",
+    "topic not available",
+)
+# Consent, login and paywall chrome. These are the imperatives and fixed
+# phrases of banners and walls; news words like "subscription", "consent"
+# or "privacy policy" on their own are not chrome.
+_CHROME = re.compile(
+    r"\b(?:accept (?:all|cookies)|reject all|allow all|manage (?:cookies|preferences|consent|settings)|"
+    r"cookie (?:settings|preferences)|(?:we|this (?:site|website)) uses? cookies|"
+    r"sign (?:in|up) to (?:continue|read)|log ?in to (?:continue|read)|"
+    r"create (?:a free |an )?account to|already (?:a member|a subscriber|have an account)|"
+    r"subscribe (?:now|today|to (?:read|continue|unlock))|start (?:your )?free trial|"
+    r"unlock (?:this|full) (?:article|story)|continue reading|this (?:article|content) is for subscribers|"
+    r"enable javascript|javascript is (?:disabled|required)|(?:disable|turn off) (?:your )?ad ?blocker|"
+    r"are you a robot|verify (?:that )?you are (?:a )?human|captcha|access denied|all rights reserved)\b",
+    re.IGNORECASE,
+)
+# Banner and wall lines are short; a longer sentence is article prose
+CHROME_MAX_WORDS = 25
+# Walls are short pages; a long text with a banner still has the article
+CHROME_MAX_TEXT_WORDS = 150
+
+# Frequent function words of the languages the sources publish in; prose
+# in any of them is full of these, while link lists, captions and garbled
+# extraction are not
+_FUNCTION_WORDS = frozenset(
+    # English
+    "the of and to a in is it that for on with as was be by this are at from or an but not have has "
+    "its they we you he she their which will can more one were been would also than "
+    # German, French, Spanish, Portuguese, Italian
+    "der die das und ist nicht ein eine zu mit von den im für auf sich dem auch "
+    "le la les et est un une des du pour dans que qui pas sur au par ce "
+    "el los las y es una por para con del se no lo como más "
+    "o os as e um uma com não do da em no na "
+    "il gli è per che non della di".split()
+)
+
+_NOTES = {
+    "placeholder": "_No summary: the article text could not be extracted._",
+    "empty": "_No summary: the article has no text._",
+    "boilerplate": "_No summary: the page only showed a cookie, login or paywall notice._",
+    "not_prose": "_No summary: the extracted text doesn't read like an article._",
+}
+
+
+def _is_latin(words):
+    return sum(1 for w in words if w.isascii()) >= 0.7 * len(words)
+
+
+def assess(text):
+    """Decide whether `text` is worth a Gemini call.
+
+    Returns {"action", "reason", "result", "scores"}: action is SUMMARIZE,
+    PASSTHROUGH or SKIP, and result is what to show instead of a summary
+    (None when summarizing).
+    """
+    sample = (text or "").strip()[:SAMPLE_CHARS]
+    words = _WORD.findall(sample.lower())
+    scores = {"words": len(words)}
+
+    def verdict(action, reason):
+        result = None
+        if action == PASSTHROUGH:
+            result = sample
+        elif action == SKIP:
+            result = _NOTES[reason]
+        return {"action": action, "reason": reason, "result": result, "scores": scores}
+
+    if not words:
+        return verdict(SKIP, "empty")
+    lowered = " ".join(words)
+    if len(words) < 20 and any(p in lowered for p in _PLACEHOLDERS):
+        return verdict(SKIP, "placeholder")
+
+    # Share of sentences/lines that are short consent, login or paywall chrome
+    lines = [line for line in _LINE_SPLIT.split(sample) if line.strip()]
+    boilerplate = sum(
+        1 for line in lines if len(line.split()) <= CHROME_MAX_WORDS and _CHROME.search(line)
+    ) / len(lines)
+    scores["boilerplate"] = round(boilerplate, 2)
+    if boilerplate >= Config.TRIAGE_MAX_BOILERPLATE and len(words) <= CHROME_MAX_TEXT_WORDS:
+        return verdict(SKIP, "boilerplate")
+
+    # Menus and link lists are many one- or two-word lines
+    paragraphs = [line for line in sample.splitlines() if line.strip()]
+    scores["words_per_line"] = round(len(words) / len(paragraphs), 1)
+    not_prose = scores["words_per_line"] < 4
+    # Language: Latin-script text should contain function words of a known
+    # language. Other scripts go to Gemini, which handles them fine.
+    if _is_latin(words):
+        function_words = sum(1 for w in words if w in _FUNCTION_WORDS) / len(words)
+        scores["function_words"] = round(function_words, 2)
+        not_prose = not_prose or function_words < Config.TRIAGE_MIN_FUNCTION_WORDS
+    if not_prose and len(words) >= 30:
+        return verdict(SKIP, "not_prose")
+
+    if len(words) < Config.TRIAGE_MIN_WORDS:
+        return verdict(PASSTHROUGH, "short")
+    return verdict(SUMMARIZE, "ok")
+
+
+def screen(text):
+    """The local stand-in for a summary, or None if the text should be
+    summarized. Counts the avoided call."""
+    verdict = assess(text)
+    if verdict["action"] == SUMMARIZE:
+        return None
+    metrics.increment("llm_calls_avoided_total", reason=verdict["reason"])
+    return verdict["result"]
@@ -1,4 +1,28 @@
+import logging
 import streamlit as st
+from config import Config
+import dedup
+import related
+
+SOURCE_LABELS = {
+    "techcrunch": "TechCrunch",
+    "hacker_news": "Hacker News",
+    "ddgs": "Web",
+    "arxiv": "arXiv",
+}
+
+logger = logging.getLogger(__name__)
+
+def configure_logging():
+    """Send application logs to Config.LOG_FILE at Config.LOG_LEVEL (once per process)."""
+    root = logging.getLogger()
+    if any(getattr(h, "_tech_insight", False) for h in root.handlers):
+        return
+    handler = logging.FileHandler(Config.LOG_FILE)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    handler._tech_insight = True
+    root.addHandler(handler)
+    root.setLevel(Config.LOG_LEVEL)
 
 def save_bookmark(item, item_type="article"):
     """Save an item to bookmarks in session state."""
@@ -22,4 +46,28 @@ def remove_bookmark(index):
     if 'bookmarks' in st.session_state and 0 <= index < len(st.session_state.bookmarks):
         st.session_state.bookmarks.pop(index)
         return True
-    return False 
\ No newline at end of file
+    return False
+
+def render_copies(doc_id):
+    """Link to other sources that carry the same story, if any."""
+    copies = dedup.get_index().copies(doc_id)
+    if copies:
+        links = " · ".join(
+            f"[{c['title'] or c['url']}]({c['url']}) ({SOURCE_LABELS.get(c.get('source'), c.get('source', ''))})"
+            for c in copies[:5]
+        )
+        st.caption(f"🔗 Also covered: {links}")
+
+def render_related(url, title="", text=""):
+    """List similar items from any source; a broken index never breaks the card."""
+    try:
+        items = related.related(url, title, text)
+    except Exception as e:
+        logger.warning("Related items lookup failed: %s", e)
+        return
+    if items:
+        links = " · ".join(
+            f"[{i['title'] or i['url']}]({i['url']}) ({SOURCE_LABELS.get(i['source'], i['source'])})"
+            for i in items
+        )
+        st.caption(f"🧭 Related: {links}")